@@ -327,20 +327,24 @@ async def main_async(args):
     components = await initialize_components(settings)
 
     # Run the appropriate mode
-    if args.mode == "terminal":
-        await run_terminal(components)
-    elif args.mode == "gateway":
-        await run_gateway(components, settings)
-    elif args.mode == "telegram":
-        await run_telegram(components, settings)
-    elif args.mode == "discord":
-        await run_discord(components, settings)
-    elif args.mode == "wizard":
-        wizard = SetupWizard()
-        await wizard.run()
-    else:
-        # Default: both terminal + gateway (+ telegram if enabled)
-        await run_both(components, settings)
+    try:
+        if args.mode == "terminal":
+            await run_terminal(components)
+        elif args.mode == "gateway":
+            await run_gateway(components, settings)
+        elif args.mode == "telegram":
+            await run_telegram(components, settings)
+        elif args.mode == "discord":
+            await run_discord(components, settings)
+        elif args.mode == "wizard":
+            wizard = SetupWizard()
+            await wizard.run()
+        else:
+            # Default: both terminal + gateway (+ telegram if enabled)
+            await run_both(components, settings)
+    finally:
+        if components["memory_manager"]:
+            await components["memory_manager"].close()
 
 
 def main():
@@ -11,8 +11,26 @@ from typing import Optional
 
 from openclaw.config.settings import get_settings
 
+try:
+    import orjson  # optional: pip install openclaw[perf]
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger("openclaw.mcp.server")
 
+if orjson is not None:
+    _ORJSON_PRETTY = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _dumps_pretty(obj) -> str:
+    """Serialize a tool result for display, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_ORJSON_PRETTY, default=str).decode()
+    return json.dumps(obj, indent=2, default=str)
+
+# Frames larger than this are dropped before JSON parsing
+DEFAULT_MAX_FRAME_BYTES = 1 << 20
+
 
 class MCPServer:
     """
@@ -146,7 +164,7 @@ class MCPServer:
             return self._success_response(request_id, result)
 
         except Exception as e:
-            logger.error(f"Error handling {method}: {e}")
+            logger.error("Error handling %s: %s", method, e)
             return self._error_response(request_id, -32603, str(e))
 
     async def _handle_initialize(self, params: dict) -> dict:
@@ -187,9 +205,9 @@ class MCPServer:
         """Format a tool result for MCP response."""
         if isinstance(result, dict):
             if result.get("success", True):
-                content = result.get("content") or result.get("result") or json.dumps(result)
+                content = result.get("content") or result.get("result") or _dumps_pretty(result)
                 if isinstance(content, dict):
-                    content = json.dumps(content, indent=2)
+                    content = _dumps_pretty(content)
                 return {
                     "content": [{"type": "text", "text": str(content)}],
                     "isError": False,
@@ -228,27 +246,35 @@ class MCPServer:
         """Run the server using stdio transport."""
         self._running = True
         logger.info("Starting MCP server (stdio)")
+        max_frame = self.settings.get("mcp.max_frame_bytes", DEFAULT_MAX_FRAME_BYTES)
+        loop = asyncio.get_event_loop()
 
         while self._running:
             try:
-                # Read line from stdin
-                line = await asyncio.get_event_loop().run_in_executor(
-                    None, sys.stdin.readline
-                )
+                # Read line from stdin, never buffering more than one frame's worth
+                line = await loop.run_in_executor(None, sys.stdin.readline, max_frame + 1)
 
                 if not line:
                     break
 
-                # Parse JSON-RPC request
+                if len(line) > max_frame:
+                    logger.warning("Dropping oversized MCP frame (> %d chars)", max_frame)
+                    if not line.endswith("\n"):
+                        await loop.run_in_executor(None, self._discard_line, max_frame)
+                    continue
+
+                # Parse JSON-RPC request (json accepts leading whitespace)
                 try:
-                    request = json.loads(line.strip())
+                    request = json.loads(line.rstrip("\r\n"))
                 except json.JSONDecodeError:
                     continue
+                if not isinstance(request, dict):
+                    continue
 
                 # Handle notifications (no id)
                 if "id" not in request:
                     # Just log and continue
-                    logger.debug(f"Received notification: {request.get('method')}")
+                    logger.debug("Received notification: %s", request.get("method"))
                     continue
 
                 # Handle request
@@ -259,10 +285,18 @@ class MCPServer:
                 sys.stdout.flush()
 
             except Exception as e:
-                logger.error(f"Error in MCP server loop: {e}")
+                logger.error("Error in MCP server loop: %s", e)
 
         logger.info("MCP server stopped")
 
+    @staticmethod
+    def _discard_line(chunk_size: int):
+        """Consume the remainder of an oversized line from stdin."""
+        while True:
+            rest = sys.stdin.readline(chunk_size)
+            if not rest or rest.endswith("\n"):
+                return
+
     def stop(self):
         """Stop the server."""
         self._running = False
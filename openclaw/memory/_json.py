@@ -0,0 +1,30 @@
+"""
+JSON helpers for memory persistence.
+Uses orjson when installed (``pip install openclaw[perf]``) and falls back to
+the stdlib with the same on-disk format: UTF-8, non-ASCII left unescaped.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes; unknown types are stringified."""
+    if orjson is not None:
+        option = _ORJSON_OPTS | orjson.OPT_INDENT_2 if indent else _ORJSON_OPTS
+        return orjson.dumps(obj, option=option, default=str)
+    return json.dumps(
+        obj, indent=2 if indent else None, ensure_ascii=False, default=str
+    ).encode("utf-8")
+
+
+def loads(data: bytes | str):
+    """Parse JSON from bytes or str."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
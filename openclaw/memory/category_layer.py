@@ -3,14 +3,64 @@ Category Layer - Aggregated, human-readable memory files.
 Memory items are organized into coherent documents (MemU's key innovation).
 """
 
+import asyncio
+import functools
+import hashlib
+import heapq
 import json
 import logging
+import re
+import sqlite3
+import struct
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
 from pathlib import Path
 from typing import Optional
 
 logger = logging.getLogger("openclaw.memory.categories")
 
+# Bursts of organize() calls within this window share a single metadata write
+PERSIST_DEBOUNCE_SECONDS = 0.1
+
+# Categories longer than this many lines get consolidated by evolve()
+CONSOLIDATE_LINE_THRESHOLD = 100
+
+# Category files are read and written off the event loop; a small dedicated
+# pool keeps disk fan-out bounded regardless of how many layers are active.
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mem-io")
+
+
+_FTS_TOKEN_RE = re.compile(r"\w+")
+_SIG_RE = re.compile(r"\(sig:(\d+(?:\.\d+)?)\)")
+# "- [2024-01-01 12:00] (sig:0.5) content" -> content
+_ENTRY_CONTENT_RE = re.compile(r"^- \[[^\]]*\] \(sig:[^)]*\) (.*)$")
+_HASH = struct.Struct("<Q")
+
+
+async def _run_io(fn, *args, **kwargs):
+    """Run a blocking filesystem call on the memory I/O pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_IO_EXECUTOR, functools.partial(fn, *args, **kwargs))
+
+
+@functools.lru_cache(maxsize=2048)
+def _format_minute(minute: int) -> str:
+    """Format an epoch minute as a local timestamp; batches share one strftime."""
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(minute * 60))
+
+
+def _content_hash(content: str) -> int:
+    """64-bit content fingerprint used for duplicate detection."""
+    digest = hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _entry_text(line: str) -> str:
+    """Strip the markdown bullet from a category entry line."""
+    return line.strip("- ").strip()
+
 
 # Default categories with descriptions
 DEFAULT_CATEGORIES = {
@@ -57,6 +107,29 @@ DEFAULT_CATEGORIES = {
 }
 
 
+@dataclass(slots=True)
+class CategoryMeta:
+    """Metadata for one category document."""
+    id: str
+    name: str = ""
+    description: str = ""
+    icon: str = "folder"
+    item_count: int = 0
+    last_updated: float = 0
+    created_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, cat_id: str, data: dict) -> "CategoryMeta":
+        known = {f.name for f in fields(cls)}
+        kwargs = {k: v for k, v in data.items() if k in known}
+        kwargs["id"] = cat_id
+        kwargs.setdefault("name", cat_id)
+        return cls(**kwargs)
+
+
 class CategoryLayer:
     """
     Organizes memory items into structured, human-readable documents.
@@ -66,70 +139,125 @@ class CategoryLayer:
     def __init__(self, store_path: Path):
         self.store_path = store_path
         self.store_path.mkdir(parents=True, exist_ok=True)
-        self._categories: dict[str, dict] = {}
+        self._categories: dict[str, CategoryMeta] = {}
         self._meta_path = self.store_path / "_meta.json"
+        self._persist_task: Optional[asyncio.Task] = None
+        # category -> (file mtime_ns, text); stale entries are detected by mtime
+        self._content_cache: dict[str, tuple[int, str]] = {}
+        # category -> content hashes already written, mirrored in {category}.hashes
+        self._seen: dict[str, set[int]] = {}
+        self._write_lock = threading.Lock()
+        # File updates now yield to the loop, so serialize read-modify-write cycles
+        self._lock = asyncio.Lock()
+
+        # Derived full-text index over category entries; the markdown files
+        # remain the source of truth and the index is rebuilt from them.
+        self._db_path = self.store_path / "_index.db"
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._fts_available = True
 
     async def load(self):
         """Load categories from disk."""
         # Load metadata
         if self._meta_path.exists():
             try:
-                self._categories = json.loads(self._meta_path.read_text(encoding="utf-8"))
+                raw = await _run_io(self._meta_path.read_text, encoding="utf-8")
+                self._categories = {
+                    cat_id: CategoryMeta.from_dict(cat_id, data)
+                    for cat_id, data in json.loads(raw).items()
+                }
             except Exception as e:
-                logger.warning(f"Failed to load category metadata: {e}")
+                logger.warning("Failed to load category metadata: %s", e)
 
         # Ensure default categories exist
         for cat_id, cat_info in DEFAULT_CATEGORIES.items():
             if cat_id not in self._categories:
-                self._categories[cat_id] = {
-                    **cat_info,
-                    "id": cat_id,
-                    "item_count": 0,
-                    "last_updated": 0,
-                    "created_at": time.time(),
-                }
+                self._categories[cat_id] = CategoryMeta(id=cat_id, **cat_info)
+
+        if await _run_io(self._index_is_stale):
+            await _run_io(self._rebuild_index)
 
         await self._persist_meta()
-        logger.info(f"Loaded {len(self._categories)} categories")
+        logger.info("Loaded %d categories", len(self._categories))
 
     async def organize(self, items: list[dict]):
         """Organize new items into appropriate categories."""
+        async with self._lock:
+            await self._organize_unlocked(items)
+        await self._persist_meta()
+
+    async def _organize_unlocked(self, items: list[dict]):
         for item in items:
             category = item.get("category", "general")
             if category not in self._categories:
                 # Create new category dynamically
-                self._categories[category] = {
-                    "id": category,
-                    "name": category.replace("_", " ").title(),
-                    "description": f"Auto-created for: {category}",
-                    "icon": "folder",
-                    "item_count": 0,
-                    "last_updated": 0,
-                    "created_at": time.time(),
-                }
+                self._categories[category] = CategoryMeta(
+                    id=category,
+                    name=category.replace("_", " ").title(),
+                    description=f"Auto-created for: {category}",
+                )
 
             # Update category file
-            cat_file = self.store_path / f"{category}.md"
             content = item.get("content", "")
             if content:
-                # Append to the category markdown file
-                existing = ""
-                if cat_file.exists():
-                    existing = cat_file.read_text(encoding="utf-8")
-                else:
-                    cat_name = self._categories[category].get("name", category)
-                    existing = f"# {cat_name}\n\n"
-
-                timestamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(item.get("created_at", time.time())))
+                meta = self._categories[category]
+                timestamp = _format_minute(int(item.get("created_at", time.time())) // 60)
                 significance = item.get("significance", 0.5)
                 entry = f"- [{timestamp}] (sig:{significance:.1f}) {content}\n"
 
-                if content not in existing:  # Avoid duplicates
-                    cat_file.write_text(existing + entry, encoding="utf-8")
-                    self._categories[category]["item_count"] = self._categories[category].get("item_count", 0) + 1
-                    self._categories[category]["last_updated"] = time.time()
+                if await _run_io(self._append_entry, category, meta.name, content, entry):
+                    meta.item_count += 1
+                    meta.last_updated = time.time()
 
-        await self._persist_meta()
+    def _append_entry(self, category: str, cat_name: str, content: str, entry: str) -> bool:
+        """Append an entry to a category file unless its content is already there."""
+        seen = self._seen_hashes(category)
+        h = _content_hash(content)
+        if h in seen:  # Avoid duplicates
+            return False
+
+        # Append instead of rewriting the whole file for every new entry
+        cat_file = self.store_path / f"{category}.md"
+        chunk = entry if cat_file.exists() else f"# {cat_name}\n\n{entry}"
+        with cat_file.open("ab") as f:
+            f.write(chunk.encode("utf-8"))
+        self._content_cache.pop(category, None)
+
+        seen.add(h)
+        with (self.store_path / f"{category}.hashes").open("ab") as f:
+            f.write(_HASH.pack(h))
+        self._index_entries(category, [entry])
+        return True
+
+    def _seen_hashes(self, category: str) -> set[int]:
+        """Load a category's content hashes, rebuilding the sidecar if needed."""
+        seen = self._seen.get(category)
+        if seen is not None:
+            return seen
+
+        hash_file = self.store_path / f"{category}.hashes"
+        cat_file = self.store_path / f"{category}.md"
+        md_mtime = cat_file.stat().st_mtime if cat_file.exists() else 0
+        if hash_file.exists() and hash_file.stat().st_mtime >= md_mtime:
+            seen = {h for (h,) in _HASH.iter_unpack(hash_file.read_bytes())}
+        else:
+            # Missing, or the markdown was edited by hand since it was written
+            seen = self._write_hashes(category, self.get_category_content(category).split("\n"))
+        self._seen[category] = seen
+        return seen
+
+    def _write_hashes(self, category: str, lines: list[str]) -> set[int]:
+        """Rewrite a category's hash sidecar from its entry lines."""
+        seen = {
+            _content_hash(m.group(1))
+            for line in lines
+            if (m := _ENTRY_CONTENT_RE.match(line.strip()))
+        }
+        (self.store_path / f"{category}.hashes").write_bytes(
+            b"".join(_HASH.pack(h) for h in seen)
+        )
+        return seen
 
     async def evolve(self):
         """
@@ -138,39 +266,37 @@ class CategoryLayer:
         """
         logger.info("Running memory evolution cycle...")
 
-        for cat_id, cat_meta in self._categories.items():
+        for cat_id in list(self._categories):
             cat_file = self.store_path / f"{cat_id}.md"
-            if not cat_file.exists():
-                continue
+            # Held from the read to the rewrite so organize() can't append
+            # an entry the consolidated file would then drop
+            async with self._lock:
+                # Cheap bounded line count first; only decode files we'll rewrite
+                if not await _run_io(self._exceeds_lines, cat_file, CONSOLIDATE_LINE_THRESHOLD):
+                    continue
 
-            content = cat_file.read_text(encoding="utf-8")
-            lines = content.strip().split("\n")
+                content = await _run_io(self.get_category_content, cat_id)
+                lines = content.strip().split("\n")
 
-            # If category is getting too large, consolidate
-            if len(lines) > 100:
-                logger.info(f"Consolidating category: {cat_id} ({len(lines)} lines)")
-                await self._consolidate_category(cat_id, lines)
+                # If category is getting too large, consolidate
+                if len(lines) > CONSOLIDATE_LINE_THRESHOLD:
+                    logger.info("Consolidating category: %s (%d lines)", cat_id, len(lines))
+                    await self._consolidate_category(cat_id, lines)
 
     async def _consolidate_category(self, cat_id: str, lines: list[str]):
         """Consolidate a large category file by grouping related items."""
-        cat_file = self.store_path / f"{cat_id}.md"
         header = lines[0] if lines and lines[0].startswith("#") else f"# {cat_id}"
 
         # Keep the most recent and significant entries
         entries = [l for l in lines[1:] if l.strip().startswith("- ")]
 
         # Sort by significance (extracted from entry)
-        def get_sig(entry):
-            try:
-                sig_start = entry.find("(sig:")
-                if sig_start >= 0:
-                    sig_end = entry.find(")", sig_start)
-                    return float(entry[sig_start + 5:sig_end])
-            except (ValueError, IndexError):
-                pass
-            return 0.5
-
-        entries.sort(key=get_sig, reverse=True)
+        scored = [
+            (float(m.group(1)) if (m := _SIG_RE.search(e)) else 0.5, e)
+            for e in entries
+        ]
+        scored.sort(key=lambda t: t[0], reverse=True)
+        entries = [e for _, e in scored]
 
         # Keep top entries, summarize the rest
         keep = entries[:50]
@@ -185,32 +311,104 @@ class CategoryLayer:
             # Save archived entries separately
             archive_file = self.store_path / f"{cat_id}_archive.md"
             archive_content = f"# {cat_id} - Archive\n\n" + "\n".join(archived) + "\n"
-            archive_file.write_text(archive_content, encoding="utf-8")
+            await _run_io(archive_file.write_text, archive_content, encoding="utf-8")
+
+        await _run_io(self._write_category, cat_id, new_content)
+        # Archived entries may be stored again, as before consolidation
+        self._seen[cat_id] = await _run_io(self._write_hashes, cat_id, keep)
+        await _run_io(self._replace_index_entries, cat_id, keep)
+
+    @staticmethod
+    def _exceeds_lines(path: Path, threshold: int) -> bool:
+        """Check whether a file has more than ``threshold`` lines.
 
-        cat_file.write_text(new_content, encoding="utf-8")
+        Counts newlines in 64 KB binary chunks and stops as soon as the
+        threshold is crossed, so large files are never read in full.
+        """
+        try:
+            with path.open("rb") as f:
+                count = 0
+                for chunk in iter(lambda: f.read(65536), b""):
+                    count += chunk.count(b"\n")
+                    if count > threshold:
+                        return True
+        except FileNotFoundError:
+            return False
+        return False
 
     def get_category_content(self, category: str) -> str:
-        """Read a category file."""
+        """Read a category file, served from cache while its mtime is unchanged."""
+        cat_file = self.store_path / f"{category}.md"
+        try:
+            mtime = cat_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._content_cache.pop(category, None)
+            return ""
+
+        cached = self._content_cache.get(category)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        text = cat_file.read_text(encoding="utf-8")
+        self._content_cache[category] = (mtime, text)
+        return text
+
+    def _write_category(self, category: str, text: str):
+        """Write a category file and refresh its cached content."""
         cat_file = self.store_path / f"{category}.md"
-        if cat_file.exists():
-            return cat_file.read_text(encoding="utf-8")
-        return ""
-
-    def list_all(self) -> list[dict]:
-        """List all categories with metadata."""
-        result = []
-        for cat_id, meta in self._categories.items():
-            result.append({
-                "id": cat_id,
-                "name": meta.get("name", cat_id),
-                "description": meta.get("description", ""),
-                "item_count": meta.get("item_count", 0),
-                "last_updated": meta.get("last_updated", 0),
-            })
-        return sorted(result, key=lambda x: x.get("item_count", 0), reverse=True)
+        cat_file.write_text(text, encoding="utf-8")
+        self._content_cache[category] = (cat_file.stat().st_mtime_ns, text)
+
+    async def get_category_content_async(self, category: str) -> str:
+        """Read a category file without blocking the event loop."""
+        return await _run_io(self.get_category_content, category)
+
+    def list_all(self, limit: Optional[int] = None) -> list[dict]:
+        """List categories with metadata, largest first.
+
+        With ``limit``, only the top entries are selected (heap, not full sort).
+        """
+        metas = self._categories.values()
+        if limit:
+            picked = heapq.nlargest(limit, metas, key=lambda m: m.item_count)
+        else:
+            picked = sorted(metas, key=lambda m: m.item_count, reverse=True)
+        return [
+            {
+                "id": meta.id,
+                "name": meta.name,
+                "description": meta.description,
+                "item_count": meta.item_count,
+                "last_updated": meta.last_updated,
+            }
+            for meta in picked
+        ]
 
     def search_categories(self, query: str, limit: int = 20) -> list[dict]:
-        """Search across all category files."""
+        """Search category entries via the full-text index."""
+        db = self._get_db()
+        if db is None:
+            return self._scan_categories(query, limit)
+
+        terms = _FTS_TOKEN_RE.findall(query.lower())
+        if not terms:
+            return []
+        # Quoted prefix terms: no FTS operators leak in, partial words still match
+        match = " ".join(f'"{t}"*' for t in terms)
+
+        with self._db_lock:
+            rows = db.execute(
+                "SELECT category, content FROM entries WHERE entries MATCH ? "
+                "ORDER BY rank LIMIT ?",
+                (match, limit),
+            ).fetchall()
+        return [
+            {"category": category, "content": content, "source": "category"}
+            for category, content in rows
+        ]
+
+    def _scan_categories(self, query: str, limit: int) -> list[dict]:
+        """Search across all category files (used when FTS5 is unavailable)."""
         results = []
         query_lower = query.lower()
 
@@ -222,19 +420,139 @@ class CategoryLayer:
                     if query_lower in line.lower() and line.strip().startswith("- "):
                         results.append({
                             "category": cat_id,
-                            "content": line.strip("- ").strip(),
+                            "content": _entry_text(line),
                             "source": "category",
                         })
                         if len(results) >= limit:
                             return results
         return results
 
+    async def search_categories_async(self, query: str, limit: int = 20) -> list[dict]:
+        """Search across all category files without blocking the event loop."""
+        return await _run_io(self.search_categories, query, limit)
+
+    # ── Full-text index ─────────────────────────────────────
+
+    def _get_db(self) -> Optional[sqlite3.Connection]:
+        if self._db is not None or not self._fts_available:
+            return self._db
+        # I/O workers can arrive here together; only one may open the index
+        with self._db_lock:
+            if self._db is None and self._fts_available:
+                try:
+                    db = sqlite3.connect(str(self._db_path), check_same_thread=False)
+                    db.execute(
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5("
+                        "category UNINDEXED, content, "
+                        "tokenize='unicode61 remove_diacritics 2')"
+                    )
+                    db.commit()
+                    self._db = db
+                except sqlite3.Error as e:
+                    logger.warning("FTS5 unavailable, category search will scan files: %s", e)
+                    self._fts_available = False
+        return self._db
+
+    def _index_is_stale(self) -> bool:
+        """True if the index is missing or older than any category file."""
+        if not self._db_path.exists():
+            return True
+        index_mtime = self._db_path.stat().st_mtime
+        return any(
+            md.stat().st_mtime > index_mtime
+            for md in self.store_path.glob("*.md")
+            if not md.stem.endswith("_archive")
+        )
+
+    def _rebuild_index(self):
+        """Repopulate the index from the markdown files."""
+        db = self._get_db()
+        if db is None:
+            return
+        with self._db_lock:
+            db.execute("DELETE FROM entries")
+            for cat_id in self._categories:
+                lines = self.get_category_content(cat_id).split("\n")
+                db.executemany(
+                    "INSERT INTO entries (category, content) VALUES (?, ?)",
+                    [
+                        (cat_id, _entry_text(line))
+                        for line in lines
+                        if line.strip().startswith("- ")
+                    ],
+                )
+            db.commit()
+
+    def _index_entries(self, category: str, entries: list[str]):
+        db = self._get_db()
+        if db is None:
+            return
+        with self._db_lock:
+            db.executemany(
+                "INSERT INTO entries (category, content) VALUES (?, ?)",
+                [(category, _entry_text(e)) for e in entries],
+            )
+            db.commit()
+
+    def _replace_index_entries(self, category: str, entries: list[str]):
+        db = self._get_db()
+        if db is None:
+            return
+        with self._db_lock:
+            db.execute("DELETE FROM entries WHERE category = ?", (category,))
+            db.executemany(
+                "INSERT INTO entries (category, content) VALUES (?, ?)",
+                [(category, _entry_text(e)) for e in entries],
+            )
+            db.commit()
+
     async def _persist_meta(self):
+        """Schedule a debounced metadata write.
+
+        Calls arriving while a write is already pending are coalesced into it;
+        the pending write serializes whatever state exists when it fires.
+        """
+        if self._persist_task and not self._persist_task.done():
+            return
+        self._persist_task = asyncio.create_task(self._persist_meta_soon())
+
+    async def _persist_meta_soon(self):
+        await asyncio.sleep(PERSIST_DEBOUNCE_SECONDS)
+        await self._write_meta()
+
+    async def _write_meta(self):
         """Save category metadata."""
-        self._meta_path.write_text(
-            json.dumps(self._categories, indent=2, ensure_ascii=False, default=str),
-            encoding="utf-8",
+        # Serialize on the loop thread so the dict can't change mid-dump
+        data = json.dumps(
+            {cat_id: meta.to_dict() for cat_id, meta in self._categories.items()},
+            indent=2, ensure_ascii=False, default=str,
         )
+        await _run_io(self._write_meta_text, data)
+
+    def _write_meta_text(self, data: str):
+        # A cancelled debounce task may still be mid-write when flush() runs
+        with self._write_lock:
+            self._meta_path.write_text(data, encoding="utf-8")
+
+    async def flush(self):
+        """Write any pending metadata immediately."""
+        task = self._persist_task
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            await self._write_meta()
+        self._persist_task = None
+
+    async def close(self):
+        """Flush pending writes and release the index before shutdown."""
+        await self.flush()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
 
     @property
     def count(self) -> int:
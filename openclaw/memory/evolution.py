@@ -7,10 +7,15 @@ After long sessions or once per day, the agent rereads all exchanges
 and writes a chapter summary to PROJECT_MEMORY.md.
 """
 
+import asyncio
 import logging
 import os
+import re
 import time
+from bisect import bisect_left
+from collections import Counter
 from datetime import datetime
+from itertools import chain
 from typing import Optional, TYPE_CHECKING
 
 from openclaw.config.settings import get_settings
@@ -20,6 +25,32 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger("openclaw.memory.evolution")
 
+# Keyword hints used to re-file "general" items (substring match)
+CATEGORY_KEYWORDS = {
+    "user_profile": ["my name", "i am", "je suis", "je m'appelle", "mon nom", "years old", "ans"],
+    "user_preferences": ["i like", "i prefer", "i love", "j'aime", "je prefere", "favorite"],
+    "technical": ["code", "function", "api", "server", "database", "git", "python", "docker"],
+    "projects": ["project", "milestone", "deadline", "sprint", "roadmap", "plan"],
+    "decisions": ["decided", "chose", "because", "rationale", "conclusion"],
+}
+
+_KEYWORD_CATEGORY = {kw: cat for cat, kws in CATEGORY_KEYWORDS.items() for kw in kws}
+# One scan finds every keyword: the lookahead tries a match at each position,
+# so overlapping hits ("plans" -> "plan", "ans") are all reported. Only one
+# keyword can match per position, so no keyword may be a prefix of another.
+_KEYWORD_ALTERNATION = "|".join(
+    re.escape(kw) for kw in sorted(_KEYWORD_CATEGORY, key=len, reverse=True)
+)
+_KEYWORD_RE = re.compile(f"(?=({_KEYWORD_ALTERNATION}))")
+
+# Long function words that say nothing about a theme (English and French)
+THEME_STOPWORDS = frozenset({
+    "about", "after", "again", "being", "could", "every", "other", "should",
+    "their", "there", "these", "thing", "things", "those", "which", "while",
+    "would", "where", "avais", "avait", "avant", "comme", "encore",
+    "parce", "peut-etre", "quand", "votre", "notre", "leurs", "cette",
+})
+
 
 class MemoryEvolver:
     """
@@ -34,16 +65,25 @@ class MemoryEvolver:
         self.items = item_layer
         self.categories = category_layer
         self.insights_generated = 0
+        # Item mutation count seen by the last organize/link pass
+        self._last_seen_mutation: Optional[int] = None
+        # Link index carried across cycles: word -> item indices, plus the
+        # token set each indexed item had when it was added
+        self._postings: dict[str, list[int]] = {}
+        self._link_tokens: list[frozenset[str]] = []
 
     async def run_cycle(self):
         """Run one evolution cycle."""
         logger.info("Starting memory evolution cycle")
 
-        # Phase 1: Organize uncategorized items
-        await self._organize()
-
-        # Phase 2: Link related items
-        await self._link()
+        # Organize and link only ever add to what a previous pass produced,
+        # so they can be skipped until items are stored or updated again
+        mutations = self.items.mutation_count
+        if mutations != self._last_seen_mutation:
+            # Phases 1 and 2 touch disjoint fields (category vs links), so
+            # organizing proceeds while link matching runs in a worker thread
+            await asyncio.gather(self._organize(), self._link())
+            self._last_seen_mutation = mutations
 
         # Phase 3: Generate insights
         await self._evolve()
@@ -53,37 +93,84 @@ class MemoryEvolver:
     async def _organize(self):
         """Re-categorize items that may be misplaced."""
         all_items = self.items.all_items()
-        recategorized = 0
+        recategorized = []
 
         for item in all_items:
             if item.get("category") == "general":
-                suggested = self._suggest_category(item.get("content", ""))
+                suggested = self._suggest_category(self.items.tokens(item).lower)
                 if suggested != "general":
                     item["category"] = suggested
-                    recategorized += 1
+                    recategorized.append(item)
 
-        if recategorized > 0:
-            logger.info(f"Recategorized {recategorized} items")
+        if recategorized:
+            self.items.mark_dirty(recategorized)
+            logger.info(f"Recategorized {len(recategorized)} items")
 
     async def _link(self):
-        """Find and record connections between memory items."""
+        """Find and record connections between memory items.
+
+        Items are append-mostly, so the inverted index survives between
+        cycles and only items added since the last pass are matched against
+        it. Any change to an already-indexed item triggers a full rebuild.
+        """
         all_items = self.items.all_items()
         if len(all_items) < 2:
             return
 
-        # Simple co-occurrence linking
-        for i, item_a in enumerate(all_items):
-            words_a = set(item_a.get("content", "").lower().split())
-            for item_b in all_items[i + 1:]:
-                words_b = set(item_b.get("content", "").lower().split())
-                overlap = words_a & words_b
-                # Remove common/stop words
-                meaningful_overlap = {w for w in overlap if len(w) > 4}
-                if len(meaningful_overlap) >= 3:
-                    links_a = item_a.get("links", [])
-                    if item_b.get("id") not in links_a:
-                        links_a.append(item_b["id"])
-                        item_a["links"] = links_a[:10]  # Max 10 links
+        # Simple co-occurrence linking over meaningful (long) words only
+        tokens = [self.items.tokens(item).long_word_set for item in all_items]
+
+        # The token cache hands back the same set until content changes
+        indexed = self._link_tokens
+        if len(indexed) > len(tokens) or any(a is not b for a, b in zip(indexed, tokens)):
+            self._postings = {}
+            indexed = self._link_tokens = []
+        start = len(indexed)
+        indexed.extend(tokens[start:])
+
+        # Matching only reads the frozen token sets, so it can run off the
+        # loop; items are then mutated back on the loop thread
+        new_links = await asyncio.to_thread(self._match_new_items, tokens, start)
+
+        linked = []
+        for i in sorted(new_links):
+            item_a = all_items[i]
+            before = len(item_a.get("links", []))
+            for j in new_links[i]:
+                item_b = all_items[j]
+                links_a = item_a.get("links", [])
+                if item_b.get("id") not in links_a:
+                    links_a.append(item_b["id"])
+                    item_a["links"] = links_a[:10]  # Max 10 links
+            # Links only grow (up to the cap), so a longer list means a change
+            if len(item_a.get("links", [])) != before:
+                linked.append(item_a)
+        self.items.mark_dirty(linked)
+
+    def _match_new_items(self, tokens: list[frozenset[str]], start: int) -> dict[int, list[int]]:
+        """Index items from ``start`` on and find earlier items sharing 3+ words.
+
+        Returns earlier item index -> later item indices (ascending).
+        """
+        # Inverted index: word -> indices of items containing it (ascending)
+        postings = self._postings
+        for i in range(start, len(tokens)):
+            for w in tokens[i]:
+                postings.setdefault(w, []).append(i)
+
+        new_links: dict[int, list[int]] = {}
+        for j in range(start, len(tokens)):
+            if len(tokens[j]) < 3:
+                continue
+            # Postings are ascending, so earlier items are a prefix before j;
+            # the chained slices are counted by Counter in C
+            overlap = Counter(chain.from_iterable(
+                p[:bisect_left(p, j)] for p in map(postings.__getitem__, tokens[j])
+            ))
+            for i, shared in overlap.items():
+                if shared >= 3:
+                    new_links.setdefault(i, []).append(j)
+        return new_links
 
     async def _evolve(self):
         """Generate new insights from existing memories."""
@@ -107,36 +194,18 @@ class MemoryEvolver:
 
     def _suggest_category(self, content: str) -> str:
         """Suggest a category based on content analysis."""
-        content_lower = content.lower()
-
-        category_keywords = {
-            "user_profile": ["my name", "i am", "je suis", "je m'appelle", "mon nom", "years old", "ans"],
-            "user_preferences": ["i like", "i prefer", "i love", "j'aime", "je prefere", "favorite"],
-            "technical": ["code", "function", "api", "server", "database", "git", "python", "docker"],
-            "projects": ["project", "milestone", "deadline", "sprint", "roadmap", "plan"],
-            "decisions": ["decided", "chose", "because", "rationale", "conclusion"],
-        }
-
-        best_cat = "general"
-        best_score = 0
-
-        for cat, keywords in category_keywords.items():
-            score = sum(1 for kw in keywords if kw in content_lower)
-            if score > best_score:
-                best_score = score
-                best_cat = cat
-
-        return best_cat
+        # Each distinct keyword found scores one point for its category
+        found = {m.group(1) for m in _KEYWORD_RE.finditer(content.lower())}
+        if not found:
+            return "general"
+        scores = Counter(_KEYWORD_CATEGORY[kw] for kw in found)
+        # Ties go to the category listed first, as before
+        return max(CATEGORY_KEYWORDS, key=lambda cat: scores[cat])
 
     def _find_common_themes(self, items: list[dict]) -> list[str]:
         """Find common themes across items."""
-        from collections import Counter
-        all_words = []
-        for item in items:
-            words = item.get("content", "").lower().split()
-            all_words.extend([w for w in words if len(w) > 4])
-
-        counter = Counter(all_words)
+        words = chain.from_iterable(self.items.tokens(item).long_words for item in items)
+        counter = Counter(w for w in words if w not in THEME_STOPWORDS)
         return [word for word, count in counter.most_common(5) if count >= 2]
 
 
@@ -161,6 +230,21 @@ MIN_EXCHANGES_FOR_CONSOLIDATION = 5
 # Minimum elapsed time (seconds) since last consolidation (default: 6 hours)
 MIN_INTERVAL_SECONDS = 6 * 3600
 
+MEMORY_FILE_TITLE = (
+    "# PROJECT MEMORY - OpenClaw\n\n"
+    "Memoire episodique narrative de l'agent. "
+    "Chaque chapitre resume une session de travail.\n"
+)
+
+# Per-message and whole-session character caps for the consolidation prompt
+MAX_EXCHANGE_CHARS = 500
+MAX_SESSION_CHARS = 8000
+_EXCHANGE_LINE = "[{role}]: {content}".format
+
+CHAPTER_SEPARATOR = "\n## Chapitre - "
+# PROJECT_MEMORY.md is read backwards in chunks of this size
+_TAIL_CHUNK_BYTES = 64 * 1024
+
 
 class EpisodicMemory:
     """
@@ -186,10 +270,34 @@ class EpisodicMemory:
         self._min_interval = self.settings.get(
             "memory.episodic.min_interval_seconds", MIN_INTERVAL_SECONDS
         )
+        # Holds just the last consolidation timestamp, so startup never
+        # has to scan the (ever-growing) markdown file
+        self._timestamp_file = self._memory_file + ".last"
         self._last_consolidation: Optional[float] = self._read_last_timestamp()
 
     def _read_last_timestamp(self) -> Optional[float]:
-        """Read the timestamp of the last consolidation from the memory file."""
+        """Read the timestamp of the last consolidation."""
+        try:
+            with open(self._timestamp_file, "r", encoding="utf-8") as f:
+                return float(f.read().strip())
+        except (OSError, ValueError):
+            pass
+
+        # No sidecar yet (older memory file): recover it from the markers once
+        timestamp = self._scan_last_timestamp()
+        if timestamp is not None:
+            self._write_timestamp(timestamp)
+        return timestamp
+
+    def _write_timestamp(self, timestamp: float):
+        try:
+            with open(self._timestamp_file, "w", encoding="utf-8") as f:
+                f.write(repr(timestamp))
+        except OSError as e:
+            logger.warning(f"Could not write consolidation timestamp: {e}")
+
+    def _scan_last_timestamp(self) -> Optional[float]:
+        """Find the last consolidation marker in the memory file."""
         if not os.path.exists(self._memory_file):
             return None
         try:
@@ -244,21 +352,26 @@ class EpisodicMemory:
             logger.warning("No brain reference - cannot generate narrative summary")
             return None
 
-        # Build session content for the prompt
+        # Build session content for the prompt, stopping as soon as the cap
+        # is certain to be hit so long sessions aren't formatted in full
         session_lines = []
+        total = -1  # no newline before the first line
         for ex in exchanges:
-            role = ex.get("role", "unknown").upper()
             content = ex.get("content", "")
             # Truncate very long messages
-            if len(content) > 500:
-                content = content[:500] + "..."
-            session_lines.append(f"[{role}]: {content}")
+            if len(content) > MAX_EXCHANGE_CHARS:
+                content = content[:MAX_EXCHANGE_CHARS] + "..."
+            line = _EXCHANGE_LINE(role=ex.get("role", "unknown").upper(), content=content)
+            session_lines.append(line)
+            total += len(line) + 1
+            if total > MAX_SESSION_CHARS:
+                break
 
         session_content = "\n".join(session_lines)
 
         # Cap the total content to avoid exceeding token limits
-        if len(session_content) > 8000:
-            session_content = session_content[:8000] + "\n... (tronque)"
+        if len(session_content) > MAX_SESSION_CHARS:
+            session_content = session_content[:MAX_SESSION_CHARS] + "\n... (tronque)"
 
         prompt = CONSOLIDATION_PROMPT.format(session_content=session_content)
 
@@ -293,19 +406,18 @@ class EpisodicMemory:
         timestamp = time.time()
         header = f"\n\n---\n\n## Chapitre - {now.strftime('%Y-%m-%d %H:%M')}\n"
         marker = f"<!-- consolidated: {timestamp} -->\n"
+        chapter = header + marker + summary + "\n"
 
-        # Create file with header if it doesn't exist
-        if not os.path.exists(self._memory_file):
-            with open(self._memory_file, "w", encoding="utf-8") as f:
-                f.write("# PROJECT MEMORY - OpenClaw\n\n")
-                f.write("Memoire episodique narrative de l'agent. ")
-                f.write("Chaque chapitre resume une session de travail.\n")
-
-        with open(self._memory_file, "a", encoding="utf-8") as f:
-            f.write(header)
-            f.write(marker)
-            f.write(summary)
-            f.write("\n")
+        # One open and one write per chapter; "x" creates the file with its
+        # title atomically, so there is no exists-then-create race
+        try:
+            with open(self._memory_file, "x", encoding="utf-8") as f:
+                f.write(MEMORY_FILE_TITLE + chapter)
+        except FileExistsError:
+            with open(self._memory_file, "a", encoding="utf-8") as f:
+                f.write(chapter)
+        # The marker stays in the markdown for humans; the sidecar is for us
+        self._write_timestamp(timestamp)
 
     def get_narrative_context(self, max_chapters: int = 3) -> str:
         """
@@ -321,13 +433,12 @@ class EpisodicMemory:
             return ""
 
         try:
-            with open(self._memory_file, "r", encoding="utf-8") as f:
-                content = f.read()
+            content = self._read_tail(max_chapters)
         except OSError:
             return ""
 
         # Split by chapter markers
-        chapters = content.split("\n## Chapitre - ")
+        chapters = content.split(CHAPTER_SEPARATOR)
         if len(chapters) <= 1:
             return ""
 
@@ -342,3 +453,26 @@ class EpisodicMemory:
             "[MEMOIRE EPISODIQUE - Resumes des sessions precedentes]\n\n"
             + "\n\n---\n\n".join(formatted)
         )
+
+    def _read_tail(self, max_chapters: int) -> str:
+        """
+        Return the memory file from its last ``max_chapters`` chapter
+        separators onward, reading backwards so older history is never loaded.
+        Returns the whole file when it holds fewer chapters than that.
+        """
+        sep = CHAPTER_SEPARATOR.encode("utf-8")
+        buf = bytearray()
+        with open(self._memory_file, "rb") as f:
+            pos = f.seek(0, os.SEEK_END)
+            while pos > 0:
+                step = min(_TAIL_CHUNK_BYTES, pos)
+                pos -= step
+                f.seek(pos)
+                buf[:0] = f.read(step)
+                if max_chapters > 0 and buf.count(sep) >= max_chapters:
+                    start = len(buf)
+                    for _ in range(max_chapters):
+                        start = buf.rfind(sep, 0, start)
+                    del buf[:start]
+                    break
+        return buf.decode("utf-8", errors="replace").replace("\r\n", "\n")
@@ -0,0 +1,275 @@
+"""
+FAISS Vector Store - in-process alternative to ChromaDB for semantic search.
+Exact inner-product search over L2-normalized embeddings (cosine similarity),
+with no SQLite round trip per query.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from openclaw.memory import _json
+from openclaw.memory.vector_store import SEARCH_FIELDS, VectorStore
+
+logger = logging.getLogger("openclaw.memory.faiss_store")
+
+INDEX_FILE = "index.faiss"
+DOCS_FILE = "documents.json"
+
+# Writes are coalesced: the index is saved this long after the last change
+SAVE_DEBOUNCE_SECONDS = 5.0
+
+
+class FaissVectorStore(VectorStore):
+    """
+    FAISS-backed vector store with the same async interface as VectorStore.
+
+    Vectors live in an exact ``IndexFlatIP`` wrapped in ``IndexIDMap2`` so
+    documents can be replaced and deleted; documents and metadata are kept
+    in a JSON file next to the index. Exact search suits collections up to
+    roughly 100K vectors. ``where`` filters support plain equality only.
+    """
+
+    def __init__(self, persist_dir: Optional[str] = None):
+        super().__init__(persist_dir)
+        self._faiss = None
+        self._np = None
+        self._index = None
+        self._docs: dict[int, dict] = {}  # faiss id -> {id, content, metadata}
+        self._keys: dict[str, int] = {}   # document id -> faiss id
+        self._next_key = 0
+        self._save_task: Optional[asyncio.Task] = None
+
+    async def initialize(self):
+        """Load the FAISS index and documents from disk."""
+        if self._initialized:
+            return
+
+        async with self._lock:
+            if self._initialized:
+                return
+
+            try:
+                import faiss
+                import numpy as np
+            except ImportError:
+                logger.error("faiss not installed. Run: pip install faiss-cpu")
+                raise
+
+            self._faiss = faiss
+            self._np = np
+            try:
+                await asyncio.to_thread(self._load)
+                self._setup_embedding_function()
+            except Exception as e:
+                logger.error(f"Failed to initialize FAISS vector store: {e}")
+                raise
+
+            self._initialized = True
+            logger.info(f"FAISS vector store initialized with {len(self._docs)} documents")
+
+    async def add(self, content: str, metadata: dict = None, doc_id: str = None) -> str:
+        """Add a document to the vector store."""
+        await self.initialize()
+
+        if not doc_id:
+            doc_id = self._generate_id(content)
+
+        embedding = await self._get_embedding(content)
+        await self._upsert([doc_id], [embedding], [content], [metadata or {}])
+
+        logger.debug(f"Added document {doc_id} to vector store")
+        return doc_id
+
+    async def add_batch(self, documents: list[dict]) -> list[str]:
+        """Add multiple documents at once."""
+        await self.initialize()
+
+        if not documents:
+            return []
+
+        contents = [doc.get("content", "") for doc in documents]
+        ids = [doc.get("id") or self._generate_id(c) for doc, c in zip(documents, contents)]
+        metadatas = [doc.get("metadata", {}) for doc in documents]
+
+        embeddings = await self._get_embeddings(contents)
+        await self._upsert(ids, embeddings, contents, metadatas)
+
+        logger.info(f"Added {len(ids)} documents to vector store")
+        return ids
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        where: dict = None,
+        include: tuple[str, ...] = SEARCH_FIELDS,
+    ) -> list[dict]:
+        """Search for similar documents (same result shape as VectorStore)."""
+        await self.initialize()
+
+        query_embedding = await self._get_embedding(query)
+
+        async with self._lock:
+            hits = await asyncio.to_thread(self._search, query_embedding, top_k, where)
+
+        formatted = []
+        for key, similarity in hits:
+            doc = self._docs[key]
+            entry = {"id": doc["id"]}
+            if "documents" in include:
+                entry["content"] = doc["content"]
+            if "metadatas" in include:
+                entry["metadata"] = doc["metadata"]
+            if "distances" in include:
+                entry["score"] = round(similarity, 4)
+            formatted.append(entry)
+        return formatted
+
+    async def get(self, ids: list[str]) -> list[dict]:
+        """Fetch documents by ID."""
+        if not ids:
+            return []
+        await self.initialize()
+
+        return [
+            {"id": doc["id"], "content": doc["content"], "metadata": doc["metadata"]}
+            for doc in (self._docs[self._keys[i]] for i in ids if i in self._keys)
+        ]
+
+    async def delete(self, doc_id: str) -> bool:
+        """Delete a document by ID."""
+        await self.initialize()
+
+        async with self._lock:
+            key = self._keys.pop(doc_id, None)
+            if key is None:
+                return False
+            del self._docs[key]
+            await asyncio.to_thread(self._index.remove_ids, self._np.array([key], dtype="int64"))
+        self._schedule_save()
+        return True
+
+    async def clear(self):
+        """Clear all documents from the store."""
+        await self.initialize()
+
+        async with self._lock:
+            self._index = None
+            self._docs.clear()
+            self._keys.clear()
+            self._next_key = 0
+        self._schedule_save()
+
+        logger.info("Vector store cleared")
+
+    async def count(self) -> int:
+        """Get the number of documents in the store."""
+        await self.initialize()
+        return len(self._docs)
+
+    async def flush(self):
+        """Write the index and documents to disk now."""
+        if self._save_task and not self._save_task.done():
+            self._save_task.cancel()
+        self._save_task = None
+        if not self._initialized:
+            return
+        async with self._lock:
+            await asyncio.to_thread(self._save)
+
+    # ── Internals ───────────────────────────────────────────
+
+    async def _upsert(self, ids, embeddings, contents, metadatas):
+        async with self._lock:
+            await asyncio.to_thread(self._upsert_sync, ids, embeddings, contents, metadatas)
+        self._schedule_save()
+
+    def _upsert_sync(self, ids, embeddings, contents, metadatas):
+        np = self._np
+        # A document id repeated in one batch keeps its last occurrence
+        latest = list({doc_id: i for i, doc_id in enumerate(ids)}.values())
+
+        vectors = np.asarray([embeddings[i] for i in latest], dtype="float32")
+        self._faiss.normalize_L2(vectors)
+        if self._index is None:
+            self._index = self._faiss.IndexIDMap2(self._faiss.IndexFlatIP(vectors.shape[1]))
+
+        replaced = [self._keys[ids[i]] for i in latest if ids[i] in self._keys]
+        if replaced:
+            self._index.remove_ids(np.asarray(replaced, dtype="int64"))
+            for key in replaced:
+                del self._docs[key]
+
+        keys = np.arange(self._next_key, self._next_key + len(latest), dtype="int64")
+        self._next_key += len(latest)
+        self._index.add_with_ids(vectors, keys)
+
+        for key, i in zip(keys.tolist(), latest):
+            self._docs[key] = {"id": ids[i], "content": contents[i], "metadata": metadatas[i]}
+            self._keys[ids[i]] = key
+
+    def _search(self, embedding, top_k: int, where: Optional[dict]) -> list[tuple[int, float]]:
+        if self._index is None or not self._docs:
+            return []
+
+        query = self._np.asarray([embedding], dtype="float32")
+        self._faiss.normalize_L2(query)
+        # A filter may reject any hit, so filtered queries rank everything
+        k = len(self._docs) if where else min(top_k, len(self._docs))
+        scores, keys = self._index.search(query, k)
+
+        hits = []
+        for key, score in zip(keys[0].tolist(), scores[0].tolist()):
+            if key < 0:
+                continue
+            if where and any(self._docs[key]["metadata"].get(f) != v for f, v in where.items()):
+                continue
+            hits.append((key, score))
+            if len(hits) == top_k:
+                break
+        return hits
+
+    def _load(self):
+        index_path = self._persist_dir / INDEX_FILE
+        docs_path = self._persist_dir / DOCS_FILE
+        if not index_path.exists() or not docs_path.exists():
+            return
+
+        self._index = self._faiss.read_index(str(index_path))
+        data = _json.loads(docs_path.read_bytes())
+        self._next_key = data.get("next_key", 0)
+        for record in data.get("documents", []):
+            key = record.pop("key")
+            self._docs[key] = record
+            self._keys[record["id"]] = key
+
+    def _save(self):
+        index_path = self._persist_dir / INDEX_FILE
+        docs_path = self._persist_dir / DOCS_FILE
+        if self._index is None:
+            index_path.unlink(missing_ok=True)
+            docs_path.unlink(missing_ok=True)
+            return
+
+        # Write both files beside the originals, then swap them in
+        tmp_index = index_path.with_suffix(".tmp")
+        self._faiss.write_index(self._index, str(tmp_index))
+        tmp_docs = docs_path.with_suffix(".tmp")
+        tmp_docs.write_bytes(_json.dumps({
+            "next_key": self._next_key,
+            "documents": [{"key": key, **doc} for key, doc in self._docs.items()],
+        }))
+        os.replace(tmp_index, index_path)
+        os.replace(tmp_docs, docs_path)
+
+    def _schedule_save(self):
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_soon())
+
+    async def _save_soon(self):
+        await asyncio.sleep(SAVE_DEBOUNCE_SECONDS)
+        self._save_task = None
+        async with self._lock:
+            await asyncio.to_thread(self._save)
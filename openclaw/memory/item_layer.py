@@ -5,17 +5,49 @@ Enhanced with ChromaDB integration for semantic search (RAG).
 """
 
 import asyncio
-import json
+import heapq
 import logging
+import os
+import sys
 import time
 import uuid
+from collections import Counter
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional
+from typing import Callable, NamedTuple, Optional
 
 from openclaw.config.settings import get_settings
+from openclaw.memory import _json
 
 logger = logging.getLogger("openclaw.memory.items")
 
+# Words shorter than this are ignored when linking and finding themes
+MIN_THEME_WORD_LENGTH = 5
+
+# Mutations are appended to _items.log; the full _index.json snapshot is
+# rewritten (and the log truncated) once this many entries accumulate.
+COMPACT_EVERY = 500
+
+# Dirty items are appended to the log in one batch at most this often
+PERSIST_DEBOUNCE_SECONDS = 0.25
+
+# Low-cardinality string fields shared by one object per distinct value on load
+_INTERNED_FIELDS = ("category", "source")
+
+
+class ItemTokens(NamedTuple):
+    """Lowercased and tokenized views of an item's content."""
+    content: str
+    lower: str
+    long_words: tuple[str, ...]
+    long_word_set: frozenset[str]
+
+
+class KeywordIndex(NamedTuple):
+    """Inverted index over item keywords, keyed by position in the item list."""
+    postings: dict[str, dict[int, float]]  # term -> {item position: term frequency}
+    doc_lengths: list[int]  # item position -> number of terms
+
 
 class ItemLayer:
     """
@@ -33,22 +65,46 @@ class ItemLayer:
         self.store_path = store_path
         self.store_path.mkdir(parents=True, exist_ok=True)
         self._items: list[dict] = []
+        self._by_id: dict[str, dict] = {}
         self._index_path = self.store_path / "_index.json"
+        self._log_path = self.store_path / "_items.log"
+        self._log_entries = 0
+        # item id -> item awaiting a log append; repeated updates coalesce
+        self._pending: dict[str, dict] = {}
+        self._flush_task: Optional[asyncio.Task] = None
         self._lock = asyncio.Lock()
         self._vector_store = None
         self.settings = get_settings()
+        # item id -> ItemTokens, reused across evolution and scoring passes
+        self._tokens: dict[str, ItemTokens] = {}
+        # content -> id of the item whose embedding already covers it
+        self._embedded: dict[str, str] = {}
+        self._mutations = 0
+        # Built on the first keyword search, then extended as items are stored
+        self._keywords: Optional[KeywordIndex] = None
+        self._keyword_tokenizer: Optional[Callable[[str], list[str]]] = None
+        # item id -> (content, term counts, term total), so rebuilding the
+        # index after an edit only re-tokenizes the edited item
+        self._keyword_terms: dict[str, tuple[str, Counter, int]] = {}
 
     async def _get_vector_store(self):
         """Lazy initialization of vector store."""
         if self._vector_store is None and self.settings.get("memory.vector.enabled", True):
+            backend = self.settings.get("memory.vector.backend", "chromadb")
             try:
-                from openclaw.memory.vector_store import VectorStore
-                self._vector_store = VectorStore(
-                    persist_dir=str(self.store_path / "vectors")
-                )
+                if backend == "faiss":
+                    from openclaw.memory.faiss_store import FaissVectorStore
+                    self._vector_store = FaissVectorStore(
+                        persist_dir=str(self.store_path / "faiss")
+                    )
+                else:
+                    from openclaw.memory.vector_store import VectorStore
+                    self._vector_store = VectorStore(
+                        persist_dir=str(self.store_path / "vectors")
+                    )
                 await self._vector_store.initialize()
             except ImportError:
-                logger.warning("ChromaDB not available, using text-only search")
+                logger.warning(f"{backend} not available, using text-only search")
             except Exception as e:
                 logger.error(f"Failed to initialize vector store: {e}")
         return self._vector_store
@@ -56,12 +112,26 @@ class ItemLayer:
     async def load(self):
         """Load items from disk."""
         self._items.clear()
+        self._tokens.clear()
+        self._keywords = None
+        self._keyword_terms.clear()
+        self._log_entries = 0
         if self._index_path.exists():
             try:
-                data = json.loads(self._index_path.read_text(encoding="utf-8"))
+                data = _json.loads(self._index_path.read_bytes())
                 self._items = data if isinstance(data, list) else []
             except Exception as e:
                 logger.warning(f"Failed to load items index: {e}")
+        self._reindex()
+        self._replay_log()
+        # Only filled by successful vector-store adds: a stored item may
+        # never have been embedded (vectors disabled, or the add failed)
+        self._embedded = {}
+        for item in self._items:
+            for key in _INTERNED_FIELDS:
+                value = item.get(key)
+                if type(value) is str:
+                    item[key] = sys.intern(value)
 
         logger.info(f"Loaded {len(self._items)} memory items")
 
@@ -80,11 +150,19 @@ class ItemLayer:
                 item["last_accessed"] = time.time()
 
             self._items.append(item)
-            await self._persist_unlocked()
-
-        # Add to vector store (outside lock to avoid blocking)
+            self._reindex_item(item)
+            if self._keywords is not None:
+                self._index_keywords(len(self._items) - 1, item)
+            self._mark_dirty(item)
+            self._mutations += 1
+
+        # Add to vector store (outside lock to avoid blocking). Identical
+        # content is already searchable through the first item's embedding.
+        content = item.get("content")
+        if not content or content in self._embedded:
+            return item["id"]
         vector_store = await self._get_vector_store()
-        if vector_store and item.get("content"):
+        if vector_store:
             try:
                 await vector_store.add(
                     content=item["content"],
@@ -96,6 +174,7 @@ class ItemLayer:
                     },
                     doc_id=item["id"]
                 )
+                self._embedded.setdefault(content, item["id"])
             except Exception as e:
                 logger.warning(f"Failed to add item to vector store: {e}")
 
@@ -104,34 +183,60 @@ class ItemLayer:
     async def update(self, item_id: str, updates: dict):
         """Update an existing item."""
         async with self._lock:
-            for item in self._items:
-                if item.get("id") == item_id:
-                    item.update(updates)
-                    await self._persist_unlocked()
-                    return True
-            return False
+            item = self._by_id.get(item_id)
+            if item is None:
+                return False
+            item.update(updates)
+            if "content" in updates:
+                self._tokens.pop(item_id, None)
+                # Content edits are rare; rebuild on the next keyword search
+                self._keywords = None
+            if "id" in updates and updates["id"] != item_id:
+                self._reindex()
+            self._mark_dirty(item)
+            self._mutations += 1
+            return True
 
     async def get(self, item_id: str) -> Optional[dict]:
         """Get an item by ID and increment access count."""
+        item = self._peek(item_id)
+        if item is not None:
+            self._touch([item])
+        return item
+
+    def _peek(self, item_id: str) -> Optional[dict]:
+        """Get an item by ID without counting it as an access."""
+        return self._by_id.get(item_id)
+
+    def _touch(self, items: list[dict]):
+        """Record an access on each item."""
+        now = time.time()
+        for item in items:
+            item["access_count"] = item.get("access_count", 0) + 1
+            item["last_accessed"] = now
+        self.mark_dirty(items)
+
+    def _reindex(self):
+        """Rebuild the id -> item map (first occurrence wins, as with a scan)."""
+        self._by_id = {}
         for item in self._items:
-            if item.get("id") == item_id:
-                item["access_count"] = item.get("access_count", 0) + 1
-                item["last_accessed"] = time.time()
-                return item
-        return None
+            self._reindex_item(item)
+
+    def _reindex_item(self, item: dict):
+        if "id" in item:
+            self._by_id.setdefault(item["id"], item)
 
     def search_text(self, query: str, limit: int = 20) -> list[dict]:
         """Simple text search across items."""
         query_lower = query.lower()
-        results = []
-        for item in self._items:
-            content = item.get("content", "").lower()
-            if query_lower in content:
-                score = self._compute_relevance(item, query_lower)
-                results.append({**item, "_score": score})
-
-        results.sort(key=lambda x: x.get("_score", 0), reverse=True)
-        return results[:limit]
+        scored = (
+            (self._compute_relevance(item, query_lower), item)
+            for item in self._items
+            if query_lower in self.tokens(item).lower
+        )
+        # Only the winners are copied into result dicts
+        top = heapq.nlargest(limit, scored, key=itemgetter(0))
+        return [{**item, "_score": score} for score, item in top]
 
     async def search_semantic(self, query: str, limit: int = 10) -> list[dict]:
         """Semantic similarity search using vector embeddings."""
@@ -141,12 +246,19 @@ class ItemLayer:
             return self.search_text(query, limit)
 
         try:
-            results = await vector_store.search(query, top_k=limit)
-            # Enrich with full item data
+            # Item data comes from the index, so only ids and scores are read
+            results = await vector_store.search(query, top_k=limit, include=("distances",))
+            # Enrich with full item data, recording all accesses in one pass
+            ids = [r.get("id") or r.get("metadata", {}).get("item_id") for r in results]
+            items = [self._peek(item_id) if item_id else None for item_id in ids]
+            self._touch([item for item in items if item])
+
+            # Document bodies are fetched only for hits missing from the index
+            missing = [item_id for item_id, item in zip(ids, items) if item_id and not item]
+            orphans = {d["id"]: d for d in await vector_store.get(missing)} if missing else {}
+
             enriched = []
-            for r in results:
-                item_id = r.get("id") or r.get("metadata", {}).get("item_id")
-                item = await self.get(item_id) if item_id else None
+            for r, item_id, item in zip(results, ids, items):
                 if item:
                     enriched.append({
                         **item,
@@ -157,7 +269,7 @@ class ItemLayer:
                     # Item from vector store but not in index
                     enriched.append({
                         "id": item_id,
-                        "content": r.get("content", ""),
+                        "content": orphans.get(item_id, {}).get("content", ""),
                         "_score": r.get("score", 0),
                         "_semantic": True,
                     })
@@ -195,15 +307,13 @@ class ItemLayer:
                 seen_ids.add(item_id)
                 merged.append(r)
 
-        # Sort by score and return top results
-        merged.sort(key=lambda x: x.get("_score", 0), reverse=True)
-        return merged[:limit]
+        # Return the top results by score
+        return heapq.nlargest(limit, merged, key=lambda x: x.get("_score", 0))
 
     def search_by_category(self, category: str, limit: int = 20) -> list[dict]:
         """Get items in a specific category."""
-        results = [i for i in self._items if i.get("category") == category]
-        results.sort(key=lambda x: x.get("significance", 0), reverse=True)
-        return results[:limit]
+        results = (i for i in self._items if i.get("category") == category)
+        return heapq.nlargest(limit, results, key=lambda x: x.get("significance", 0))
 
     def all_items(self) -> list[dict]:
         """Return all items."""
@@ -211,18 +321,66 @@ class ItemLayer:
 
     def get_recent(self, limit: int = 20) -> list[dict]:
         """Get most recently created items."""
-        sorted_items = sorted(self._items, key=lambda x: x.get("created_at", 0), reverse=True)
-        return sorted_items[:limit]
+        return heapq.nlargest(limit, self._items, key=lambda x: x.get("created_at", 0))
 
     def get_significant(self, min_significance: float = 0.5, limit: int = 20) -> list[dict]:
         """Get most significant items."""
-        filtered = [i for i in self._items if i.get("significance", 0) >= min_significance]
-        filtered.sort(key=lambda x: x.get("significance", 0), reverse=True)
-        return filtered[:limit]
+        # nlargest keeps the top `limit` in a heap: O(N log limit), and ties
+        # keep insertion order exactly like a stable reverse sort
+        filtered = (i for i in self._items if i.get("significance", 0) >= min_significance)
+        return heapq.nlargest(limit, filtered, key=lambda x: x.get("significance", 0))
+
+    def tokens(self, item: dict) -> ItemTokens:
+        """Return cached lowercase/tokenized views of an item's content."""
+        content = item.get("content", "")
+        item_id = item.get("id")
+        cached = self._tokens.get(item_id) if item_id else None
+        if cached is not None and (cached.content is content or cached.content == content):
+            return cached
+
+        lower = content.lower()
+        long_words = tuple(w for w in lower.split() if len(w) >= MIN_THEME_WORD_LENGTH)
+        tokens = ItemTokens(content, lower, long_words, frozenset(long_words))
+        if item_id:
+            self._tokens[item_id] = tokens
+        return tokens
+
+    def keyword_index(self, tokenize: Callable[[str], list[str]]) -> KeywordIndex:
+        """Return the inverted keyword index, building it with ``tokenize``."""
+        if (
+            self._keywords is None
+            or tokenize != self._keyword_tokenizer
+            or len(self._keywords.doc_lengths) != len(self._items)
+        ):
+            if tokenize != self._keyword_tokenizer:
+                self._keyword_terms.clear()
+            self._keyword_tokenizer = tokenize
+            self._keywords = KeywordIndex({}, [])
+            for pos, item in enumerate(self._items):
+                self._index_keywords(pos, item)
+        return self._keywords
+
+    def _index_keywords(self, pos: int, item: dict):
+        content = item.get("content", "")
+        item_id = item.get("id")
+        cached = self._keyword_terms.get(item_id) if item_id else None
+        if cached is not None and cached[0] == content:
+            _, counts, total = cached
+        else:
+            terms = self._keyword_tokenizer(content)
+            counts, total = Counter(terms), len(terms)
+            if item_id:
+                self._keyword_terms[item_id] = (content, counts, total)
+
+        # Store normalized tf so queries only multiply in the idf
+        postings = self._keywords.postings
+        for term, count in counts.items():
+            postings.setdefault(term, {})[pos] = count / total
+        self._keywords.doc_lengths.append(total)
 
     def _compute_relevance(self, item: dict, query: str) -> float:
         """Compute relevance score for an item against a query."""
-        content = item.get("content", "").lower()
+        content = self.tokens(item).lower
         significance = item.get("significance", 0.5)
         access_count = item.get("access_count", 0)
 
@@ -238,18 +396,111 @@ class ItemLayer:
         # Combined score
         return (text_score * 0.4) + (significance * 0.3) + (recency_score * 0.2) + (min(access_count / 10, 1) * 0.1)
 
-    async def _persist_unlocked(self):
-        """Save items to disk (caller must hold lock)."""
-        self._index_path.write_text(
-            json.dumps(self._items, indent=2, ensure_ascii=False, default=str),
-            encoding="utf-8",
+    def _replay_log(self):
+        """Apply logged upserts on top of the loaded snapshot."""
+        if not self._log_path.exists():
+            return
+        with self._log_path.open("rb") as f:
+            for line in f:
+                try:
+                    item = _json.loads(line)["item"]
+                except (ValueError, KeyError, TypeError):
+                    # A torn final line from an interrupted write
+                    logger.warning("Skipping unreadable item log entry")
+                    continue
+                existing = self._by_id.get(item.get("id"))
+                if existing is not None:
+                    existing.clear()
+                    existing.update(item)
+                else:
+                    self._items.append(item)
+                    self._reindex_item(item)
+                self._log_entries += 1
+
+    def mark_dirty(self, items: list[dict]):
+        """Queue items changed in place (not via update) for persistence."""
+        for item in items:
+            self._mark_dirty(item)
+
+    def _mark_dirty(self, item: dict):
+        """Queue an item for the next batched log append."""
+        self._pending[item["id"]] = item
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_soon())
+
+    async def _flush_soon(self):
+        await asyncio.sleep(PERSIST_DEBOUNCE_SECONDS)
+        # Shielded so flush() cancelling us can't interrupt a write midway
+        await asyncio.shield(self._write_pending())
+
+    async def _write_pending(self):
+        async with self._lock:
+            await self._write_pending_unlocked()
+
+    async def _write_pending_unlocked(self):
+        """Append queued items to the log (caller must hold lock)."""
+        if not self._pending:
+            return
+        lines = b"".join(
+            _json.dumps({"op": "upsert", "item": item}) + b"\n"
+            for item in self._pending.values()
         )
+        self._log_entries += len(self._pending)
+        self._pending.clear()
+        await asyncio.to_thread(self._append_log, lines)
+        if self._log_entries >= COMPACT_EVERY:
+            await self._persist_unlocked()
 
-    async def _persist(self):
-        """Save items to disk with lock."""
+    def _append_log(self, lines: bytes):
+        with self._log_path.open("ab") as f:
+            f.write(lines)
+
+    async def flush(self):
+        """Append any queued items to the log immediately."""
+        task = self._flush_task
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        await self._write_pending()
+
+    async def _persist_unlocked(self):
+        """Write a full snapshot and truncate the log (caller must hold lock)."""
+        # Serialize on the loop thread so items can't change mid-dump
+        payload = _json.dumps(self._items, indent=True)
+        self._pending.clear()
+        await asyncio.to_thread(self._write_snapshot, payload)
+        self._log_entries = 0
+
+    def _write_snapshot(self, payload: bytes):
+        tmp_path = self._index_path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, self._index_path)
+        # Replaying a log over a newer snapshot is harmless, so order is safe
+        self._log_path.unlink(missing_ok=True)
+
+    async def compact(self):
+        """Fold the mutation log into a fresh snapshot."""
         async with self._lock:
             await self._persist_unlocked()
 
+    async def close(self):
+        """Persist everything before shutdown."""
+        await self.flush()
+        await self.compact()
+        # Stores that buffer writes (FAISS) save now; ChromaDB persists itself
+        flush_vectors = getattr(self._vector_store, "flush", None)
+        if flush_vectors is not None:
+            await flush_vectors()
+
     @property
     def count(self) -> int:
         return len(self._items)
+
+    @property
+    def mutation_count(self) -> int:
+        """Number of stores and updates since this layer was created."""
+        return self._mutations
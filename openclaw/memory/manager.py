@@ -10,6 +10,7 @@ Layer 3 - Category Layer: Aggregated, organized memory files
 import asyncio
 import json
 import logging
+import re
 import time
 from pathlib import Path
 from typing import Optional
@@ -23,6 +24,31 @@ from .retrieval import HybridRetrieval
 
 logger = logging.getLogger("openclaw.memory")
 
+# Items processed by the forgetting pass before yielding to the event loop
+FORGETTING_BATCH_SIZE = 1000
+
+# Significance indicators (substring match)
+HIGH_SIG_PATTERNS = [
+    "my name is", "i am", "i like", "i prefer", "i want", "i need",
+    "remember", "important", "always", "never", "password", "key",
+    "je m'appelle", "je suis", "j'aime", "je prefere", "je veux",
+    "mon nom", "mon", "ma", "mes", "notre", "nos",
+]
+MEDIUM_SIG_PATTERNS = [
+    "please", "could you", "how to", "what is", "explain",
+    "s'il vous plait", "comment", "qu'est-ce que", "expliquer",
+]
+
+
+def _any_substring_re(patterns: list[str]) -> re.Pattern:
+    """One regex that matches wherever any of the patterns occurs."""
+    return re.compile("|".join(re.escape(p) for p in patterns))
+
+
+# A single scan per sentence instead of one substring test per pattern
+_HIGH_SIG_RE = _any_substring_re(HIGH_SIG_PATTERNS)
+_MEDIUM_SIG_RE = _any_substring_re(MEDIUM_SIG_PATTERNS)
+
 
 class MemoryManager:
     """
@@ -222,31 +248,14 @@ class MemoryManager:
         # Split into sentences
         sentences = [s.strip() for s in text.replace("\n", ". ").split(".") if len(s.strip()) > 15]
 
-        # Significance indicators
-        high_sig_patterns = [
-            "my name is", "i am", "i like", "i prefer", "i want", "i need",
-            "remember", "important", "always", "never", "password", "key",
-            "je m'appelle", "je suis", "j'aime", "je prefere", "je veux",
-            "mon nom", "mon", "ma", "mes", "notre", "nos",
-        ]
-        medium_sig_patterns = [
-            "please", "could you", "how to", "what is", "explain",
-            "s'il vous plait", "comment", "qu'est-ce que", "expliquer",
-        ]
-
         for sentence in sentences[:20]:  # Limit processing
             lower = sentence.lower()
             significance = 0.3  # base
 
-            for pattern in high_sig_patterns:
-                if pattern in lower:
-                    significance = max(significance, 0.8)
-                    break
-
-            for pattern in medium_sig_patterns:
-                if pattern in lower:
-                    significance = max(significance, 0.5)
-                    break
+            if _HIGH_SIG_RE.search(lower):
+                significance = 0.8
+            elif _MEDIUM_SIG_RE.search(lower):
+                significance = 0.5
 
             # Longer, more detailed content is more significant
             if len(sentence) > 100:
@@ -284,15 +293,31 @@ class MemoryManager:
         decay_rate = self.settings.get("memory.forgetting.decay_rate", 0.01)
         min_access = self.settings.get("memory.forgetting.min_access_count", 2)
         grace_days = self.settings.get("memory.forgetting.grace_period_days", 30)
-        grace_seconds = grace_days * 86400
         now = time.time()
+        # Items created after the cutoff are still in their grace period
+        cutoff = now - grace_days * 86400
 
-        for item in self.items.all_items():
-            age = now - item.get("created_at", now)
-            if age < grace_seconds:
-                continue
-            if item.get("access_count", 0) < min_access:
+        decayed = []
+        for i, item in enumerate(self.items.all_items(), 1):
+            if item.get("access_count", 0) < min_access and item.get("created_at", now) <= cutoff:
                 item["significance"] = max(0.05, item.get("significance", 0.5) - decay_rate)
+                decayed.append(item)
+            if i % FORGETTING_BATCH_SIZE == 0:
+                # Let pending requests run between batches on large stores
+                await asyncio.sleep(0)
+        self.items.mark_dirty(decayed)
+
+    async def close(self):
+        """Stop background evolution and flush pending writes to disk."""
+        if self._evolution_task:
+            self._evolution_task.cancel()
+            try:
+                await self._evolution_task
+            except asyncio.CancelledError:
+                pass
+            self._evolution_task = None
+        await self.items.close()
+        await self.categories.close()
 
     async def get_stats(self) -> dict:
         return {
@@ -4,13 +4,15 @@ The foundation layer that stores all original data.
 Resources are NEVER deleted (MemU principle).
 """
 
-import json
+import asyncio
 import logging
 import time
 import uuid
 from pathlib import Path
 from typing import Optional
 
+from openclaw.memory import _json
+
 logger = logging.getLogger("openclaw.memory.resources")
 
 
@@ -24,24 +26,36 @@ class ResourceLayer:
         self.store_path = store_path
         self.store_path.mkdir(parents=True, exist_ok=True)
         self._index: dict[str, dict] = {}
+        # One metadata line per resource file, so load() doesn't have to
+        # open and parse every resource at startup
+        self._meta_path = self.store_path / "_index.jsonl"
+        # rid -> lowercased file text, filled as resources are stored or
+        # first searched; resources are immutable, so it never goes stale
+        self._search_text: dict[str, str] = {}
 
     async def load(self):
         """Load resource index from disk."""
         self._index.clear()
+        self._search_text.clear()
+        records = self._read_meta()
+
+        missing = []
         for f in sorted(self.store_path.glob("*.json")):
-            try:
-                data = json.loads(f.read_text(encoding="utf-8"))
-                rid = data.get("id", f.stem)
-                self._index[rid] = {
-                    "id": rid,
-                    "type": data.get("type", "unknown"),
-                    "timestamp": data.get("timestamp", 0),
-                    "path": str(f),
-                    "size": f.stat().st_size,
-                }
-            except Exception as e:
-                logger.warning(f"Failed to load resource {f}: {e}")
+            record = records.get(f.name)
+            if record is None:
+                # Stored before the metadata log existed, or the append was lost
+                try:
+                    raw = f.read_bytes()
+                    data = _json.loads(raw)
+                except Exception as e:
+                    logger.warning(f"Failed to load resource {f}: {e}")
+                    continue
+                record = self._meta_record(data.get("id", f.stem), data, f.name, len(raw))
+                missing.append(record)
+            self._index[record["id"]] = self._index_entry(record)
 
+        if missing:
+            self._append_meta(missing)
         logger.info(f"Loaded {len(self._index)} resources")
 
     async def store(self, data: dict) -> str:
@@ -52,20 +66,54 @@ class ResourceLayer:
             data["timestamp"] = time.time()
 
         filepath = self.store_path / f"{rid}.json"
-        filepath.write_text(
-            json.dumps(data, indent=2, ensure_ascii=False, default=str),
-            encoding="utf-8",
-        )
+        payload = _json.dumps(data, indent=True)
+        record = self._meta_record(rid, data, filepath.name, len(payload))
+        await asyncio.to_thread(self._write_resource, filepath, payload, record)
+        self._search_text[rid] = payload.decode("utf-8").lower()
+        self._index[rid] = self._index_entry(record)
+
+        return rid
+
+    def _write_resource(self, filepath: Path, payload: bytes, record: dict):
+        filepath.write_bytes(payload)
+        self._append_meta([record])
 
-        self._index[rid] = {
+    @staticmethod
+    def _meta_record(rid: str, data: dict, filename: str, size: int) -> dict:
+        return {
             "id": rid,
             "type": data.get("type", "unknown"),
-            "timestamp": data["timestamp"],
-            "path": str(filepath),
-            "size": filepath.stat().st_size,
+            "timestamp": data.get("timestamp", 0),
+            "file": filename,
+            "size": size,
         }
 
-        return rid
+    def _index_entry(self, record: dict) -> dict:
+        return {
+            "id": record["id"],
+            "type": record["type"],
+            "timestamp": record["timestamp"],
+            "path": str(self.store_path / record["file"]),
+            "size": record["size"],
+        }
+
+    def _read_meta(self) -> dict[str, dict]:
+        """Read the metadata log as filename -> record."""
+        records = {}
+        if not self._meta_path.exists():
+            return records
+        for line in self._meta_path.read_bytes().splitlines():
+            try:
+                record = _json.loads(line)
+                records[record["file"]] = record
+            except (ValueError, KeyError, TypeError):
+                # A torn final line; the file is re-read and re-logged
+                continue
+        return records
+
+    def _append_meta(self, records: list[dict]):
+        with self._meta_path.open("ab") as f:
+            f.write(b"".join(_json.dumps(r) + b"\n" for r in records))
 
     async def get(self, resource_id: str) -> Optional[dict]:
         """Retrieve a resource by ID."""
@@ -73,7 +121,7 @@ class ResourceLayer:
             return None
         filepath = Path(self._index[resource_id]["path"])
         if filepath.exists():
-            return json.loads(filepath.read_text(encoding="utf-8"))
+            return _json.loads(filepath.read_bytes())
         return None
 
     async def search(self, query: str, resource_type: str = None, limit: int = 50) -> list[dict]:
@@ -85,12 +133,17 @@ class ResourceLayer:
             if resource_type and meta["type"] != resource_type:
                 continue
             filepath = Path(meta["path"])
-            if filepath.exists():
-                content = filepath.read_text(encoding="utf-8").lower()
-                if query_lower in content:
-                    results.append(meta)
-                    if len(results) >= limit:
-                        break
+            text = self._search_text.get(rid)
+            if text is None:
+                try:
+                    text = filepath.read_bytes().decode("utf-8").lower()
+                except OSError:
+                    continue
+                self._search_text[rid] = text
+            if query_lower in text and filepath.exists():
+                results.append(meta)
+                if len(results) >= limit:
+                    break
         return results
 
     @property
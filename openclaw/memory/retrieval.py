@@ -4,15 +4,44 @@ Combines semantic, keyword, and contextual search (MemU approach).
 Enhanced with ChromaDB vector embeddings for true semantic search (RAG).
 """
 
+import asyncio
+import heapq
 import logging
 import math
 import re
 import time
-from collections import Counter
+from operator import itemgetter
 from typing import Optional
 
 logger = logging.getLogger("openclaw.memory.retrieval")
 
+STOP_WORDS = frozenset({
+    "the", "a", "an", "is", "are", "was", "were", "be", "been",
+    "being", "have", "has", "had", "do", "does", "did", "will",
+    "would", "shall", "should", "may", "might", "can", "could",
+    "to", "of", "in", "for", "on", "with", "at", "by", "from",
+    "it", "this", "that", "and", "or", "not", "but", "if", "then",
+    "le", "la", "les", "de", "du", "des", "un", "une", "et",
+    "ou", "en", "dans", "sur", "avec", "par", "pour", "est",
+    "sont", "je", "tu", "il", "elle", "nous", "vous", "ils",
+})
+# Runs of word characters, at least two long; same tokens as blanking
+# punctuation then splitting, without building the intermediate string
+_TOKEN_RE = re.compile(r"\w{2,}")
+
+# Recency decays over ~30 days, so per-item recency is recomputed at most
+# this often rather than on every contextual query
+RECENCY_REFRESH_SECONDS = 60
+
+
+def _merge_key(result: dict) -> str:
+    """Dedup key for merging results: the item id, else the full content.
+
+    Category hits have no id. Their whole content is used (not a prefix) so
+    entries sharing an opening don't collide; str caches its own hash.
+    """
+    return result.get("id") or result.get("content", "")
+
 
 class HybridRetrieval:
     """
@@ -27,6 +56,10 @@ class HybridRetrieval:
     def __init__(self, item_layer, category_layer):
         self.items = item_layer
         self.categories = category_layer
+        # Recency per item position, computed as of _recency_at
+        self._recency: list[float] = []
+        self._recency_at = 0.0
+        self._recency_items: Optional[list] = None
 
     async def search(self, query: str, top_k: int = 10, method: str = "hybrid") -> list[dict]:
         """
@@ -58,8 +91,12 @@ class HybridRetrieval:
         Combine semantic, keyword, and contextual scores for best results.
         This is the recommended search method for RAG.
         """
-        # Get semantic results (highest weight - true understanding)
-        semantic_results = await self._semantic_search(query, top_k * 2)
+        # Semantic results (highest weight - true understanding) and category
+        # results both wait on I/O, so they run concurrently
+        semantic_results, category_results = await asyncio.gather(
+            self._semantic_search(query, top_k * 2),
+            self.categories.search_categories_async(query, top_k),
+        )
 
         # Get keyword results (exact matches)
         keyword_results = self._keyword_search(query, top_k * 2)
@@ -67,70 +104,63 @@ class HybridRetrieval:
         # Get contextual results (importance/recency)
         contextual_results = self._contextual_search(query, top_k * 2)
 
-        # Get category results
-        category_results = self.categories.search_categories(query, top_k)
-
-        # Merge with weighted scoring
-        seen = set()
+        # Merge with weighted scoring; key -> merged entry makes boosting O(1)
+        seen: dict[str, dict] = {}
         merged = []
 
         # Semantic results get highest weight (0.4)
         for r in semantic_results:
-            key = r.get("id") or r.get("content", "")[:100]
+            key = _merge_key(r)
             if key not in seen:
-                seen.add(key)
+                seen[key] = r
                 r["_final_score"] = r.get("_score", 0) * 0.4
                 r["_match_type"] = "semantic"
                 merged.append(r)
 
         # Keyword results (0.3)
         for r in keyword_results:
-            key = r.get("id") or r.get("content", "")[:100]
-            if key in seen:
+            key = _merge_key(r)
+            m = seen.get(key)
+            if m is not None:
                 # Boost existing
-                for m in merged:
-                    m_key = m.get("id") or m.get("content", "")[:100]
-                    if m_key == key:
-                        m["_final_score"] = m.get("_final_score", 0) + r.get("_score", 0) * 0.3
-                        m["_match_type"] = "semantic+keyword"
+                m["_final_score"] = m.get("_final_score", 0) + r.get("_score", 0) * 0.3
+                m["_match_type"] = "semantic+keyword"
             else:
-                seen.add(key)
+                seen[key] = r
                 r["_final_score"] = r.get("_score", 0) * 0.3
                 r["_match_type"] = "keyword"
                 merged.append(r)
 
         # Contextual results (0.2)
         for r in contextual_results:
-            key = r.get("id") or r.get("content", "")[:100]
-            if key in seen:
-                for m in merged:
-                    m_key = m.get("id") or m.get("content", "")[:100]
-                    if m_key == key:
-                        m["_final_score"] = m.get("_final_score", 0) + r.get("_score", 0) * 0.2
+            key = _merge_key(r)
+            m = seen.get(key)
+            if m is not None:
+                m["_final_score"] = m.get("_final_score", 0) + r.get("_score", 0) * 0.2
             else:
-                seen.add(key)
+                seen[key] = r
                 r["_final_score"] = r.get("_score", 0) * 0.2
                 r["_match_type"] = "contextual"
                 merged.append(r)
 
         # Category results (0.1)
         for r in category_results:
-            key = r.get("id") or r.get("content", "")[:100]
+            key = _merge_key(r)
             if key not in seen:
-                seen.add(key)
+                seen[key] = r
                 r["_final_score"] = 0.1
                 r["_match_type"] = "category"
                 merged.append(r)
 
-        merged.sort(key=lambda x: x.get("_final_score", 0), reverse=True)
+        top = heapq.nlargest(top_k, merged, key=lambda x: x.get("_final_score", 0))
 
         # Clean up internal scores before returning
-        for r in merged[:top_k]:
+        for r in top:
             r.pop("_score", None)
             r.pop("_final_score", None)
             r.pop("_semantic", None)
 
-        return merged[:top_k]
+        return top
 
     def _keyword_search(self, query: str, top_k: int) -> list[dict]:
         """TF-IDF inspired keyword search."""
@@ -138,37 +168,25 @@ class HybridRetrieval:
         if not query_terms:
             return []
 
-        # Get term frequencies across all items
         all_items = self.items.all_items()
         if not all_items:
             return []
 
+        # Only items sharing a query term are touched, via the inverted index
+        index = self.items.keyword_index(self._tokenize)
         doc_count = len(all_items)
-        term_doc_freq = Counter()
-        for item in all_items:
-            item_terms = set(self._tokenize(item.get("content", "")))
-            for term in query_terms:
-                if term in item_terms:
-                    term_doc_freq[term] += 1
-
-        # Score each item
-        scored = []
-        for item in all_items:
-            item_terms = self._tokenize(item.get("content", ""))
-            item_term_freq = Counter(item_terms)
-
-            score = 0
-            for term in query_terms:
-                tf = item_term_freq.get(term, 0) / max(len(item_terms), 1)
-                df = term_doc_freq.get(term, 0)
-                idf = math.log((doc_count + 1) / (df + 1)) + 1
-                score += tf * idf
-
-            if score > 0:
-                scored.append({**item, "_score": score})
-
-        scored.sort(key=lambda x: x["_score"], reverse=True)
-        return scored[:top_k]
+        scores: dict[int, float] = {}
+        for term in query_terms:
+            docs = index.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log((doc_count + 1) / (len(docs) + 1)) + 1
+            for pos, tf in docs.items():
+                scores[pos] = scores.get(pos, 0) + tf * idf
+
+        # Best score first; ties keep item order
+        ranked = heapq.nsmallest(top_k, scores.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [{**all_items[pos], "_score": score} for pos, score in ranked]
 
     def _contextual_search(self, query: str, top_k: int) -> list[dict]:
         """Search based on significance, recency, and access patterns."""
@@ -176,40 +194,45 @@ class HybridRetrieval:
         if not all_items:
             return []
 
-        now = time.time()
+        recencies = self._recency_scores(all_items)
         scored = []
 
-        for item in all_items:
+        for item, recency in zip(all_items, recencies):
             significance = item.get("significance", 0.5)
             access_count = item.get("access_count", 0)
-            age_hours = (now - item.get("created_at", now)) / 3600
-
-            # Recency: exponential decay
-            recency = math.exp(-age_hours / (720))  # ~30 day half-life
 
             # Access frequency
             freq_score = min(access_count / 10, 1.0)
 
             score = (significance * 0.5) + (recency * 0.3) + (freq_score * 0.2)
-            scored.append({**item, "_score": score})
+            scored.append((score, item))
+
+        # Only the winners are copied into result dicts
+        top = heapq.nlargest(top_k, scored, key=itemgetter(0))
+        return [{**item, "_score": score} for score, item in top]
 
-        scored.sort(key=lambda x: x["_score"], reverse=True)
-        return scored[:top_k]
+    def _recency_scores(self, all_items: list[dict]) -> list[float]:
+        """Exponential recency per item, refreshed every RECENCY_REFRESH_SECONDS.
+
+        Items are append-only, so between refreshes only new items are scored.
+        """
+        now = time.time()
+        if (
+            now - self._recency_at >= RECENCY_REFRESH_SECONDS
+            or all_items is not self._recency_items
+            or len(self._recency) > len(all_items)
+        ):
+            self._recency = []
+            self._recency_at = now
+            self._recency_items = all_items
+
+        ref = self._recency_at
+        for item in all_items[len(self._recency):]:
+            # Items stored since the refresh count as brand new
+            age_hours = max(0.0, ref - item.get("created_at", ref)) / 3600
+            self._recency.append(math.exp(-age_hours / 720))  # ~30 day half-life
+        return self._recency
 
     def _tokenize(self, text: str) -> list[str]:
         """Simple tokenizer for keyword search."""
-        # Remove punctuation and lowercase
-        text = re.sub(r"[^\w\s]", " ", text.lower())
-        # Split and filter stop words
-        stop_words = {
-            "the", "a", "an", "is", "are", "was", "were", "be", "been",
-            "being", "have", "has", "had", "do", "does", "did", "will",
-            "would", "shall", "should", "may", "might", "can", "could",
-            "to", "of", "in", "for", "on", "with", "at", "by", "from",
-            "it", "this", "that", "and", "or", "not", "but", "if", "then",
-            "le", "la", "les", "de", "du", "des", "un", "une", "et",
-            "ou", "en", "dans", "sur", "avec", "par", "pour", "est",
-            "sont", "a", "je", "tu", "il", "elle", "nous", "vous", "ils",
-        }
-        tokens = text.split()
-        return [t for t in tokens if t not in stop_words and len(t) > 1]
+        return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
@@ -6,6 +6,8 @@ Provides embedding generation and similarity search for RAG.
 import asyncio
 import hashlib
 import logging
+import math
+from collections import Counter
 from pathlib import Path
 from typing import Optional
 
@@ -13,6 +15,13 @@ from openclaw.config.settings import get_settings
 
 logger = logging.getLogger("openclaw.memory.vector_store")
 
+# Documents per Chroma upsert, so a large batch isn't one huge transaction
+UPSERT_BATCH_SIZE = 250
+# Inputs per OpenAI embeddings request (API limit)
+OPENAI_MAX_BATCH = 2048
+# Fields VectorStore.search reads from Chroma unless told otherwise
+SEARCH_FIELDS = ("documents", "metadatas", "distances")
+
 
 class VectorStore:
     """
@@ -55,27 +64,30 @@ class VectorStore:
                 import chromadb
                 from chromadb.config import Settings as ChromaSettings
 
-                # Initialize persistent client
-                self._client = chromadb.PersistentClient(
-                    path=str(self._persist_dir),
-                    settings=ChromaSettings(
-                        anonymized_telemetry=False,
-                        allow_reset=True,
+                collection_name = self.settings.get("memory.vector.collection", "openclaw_memory")
+
+                def open_collection():
+                    # Opening the persistent client loads SQLite and HNSW files
+                    client = chromadb.PersistentClient(
+                        path=str(self._persist_dir),
+                        settings=ChromaSettings(
+                            anonymized_telemetry=False,
+                            allow_reset=True,
+                        )
                     )
-                )
+                    collection = client.get_or_create_collection(
+                        name=collection_name,
+                        metadata={"hnsw:space": "cosine"}
+                    )
+                    return client, collection, collection.count()
 
-                # Get or create collection
-                collection_name = self.settings.get("memory.vector.collection", "openclaw_memory")
-                self._collection = self._client.get_or_create_collection(
-                    name=collection_name,
-                    metadata={"hnsw:space": "cosine"}
-                )
+                self._client, self._collection, doc_count = await asyncio.to_thread(open_collection)
 
                 # Set up embedding function
                 self._setup_embedding_function()
 
                 self._initialized = True
-                logger.info(f"VectorStore initialized with {self._collection.count()} documents")
+                logger.info(f"VectorStore initialized with {doc_count} documents")
 
             except ImportError:
                 logger.error("chromadb not installed. Run: pip install chromadb")
@@ -116,8 +128,8 @@ class VectorStore:
         self._embedding_fn = FallbackEmbedder()
 
     def _generate_id(self, content: str) -> str:
-        """Generate a unique ID for content."""
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
+        """Generate a unique ID for content (16 hex chars, not cryptographic)."""
+        return hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
 
     async def add(self, content: str, metadata: dict = None, doc_id: str = None) -> str:
         """Add a document to the vector store."""
@@ -129,7 +141,8 @@ class VectorStore:
         embedding = await self._get_embedding(content)
 
         async with self._lock:
-            self._collection.upsert(
+            await asyncio.to_thread(
+                self._collection.upsert,
                 ids=[doc_id],
                 embeddings=[embedding],
                 documents=[content],
@@ -143,8 +156,10 @@ class VectorStore:
         """Add multiple documents at once."""
         await self.initialize()
 
+        if not documents:
+            return []
+
         ids = []
-        embeddings = []
         contents = []
         metadatas = []
 
@@ -154,57 +169,98 @@ class VectorStore:
             ids.append(doc_id)
             contents.append(content)
             metadatas.append(doc.get("metadata", {}))
-            embeddings.append(await self._get_embedding(content))
+
+        # One provider call for the whole batch instead of one per document
+        embeddings = await self._get_embeddings(contents)
 
         async with self._lock:
-            self._collection.upsert(
-                ids=ids,
-                embeddings=embeddings,
-                documents=contents,
-                metadatas=metadatas
-            )
+            for start in range(0, len(ids), UPSERT_BATCH_SIZE):
+                end = start + UPSERT_BATCH_SIZE
+                await asyncio.to_thread(
+                    self._collection.upsert,
+                    ids=ids[start:end],
+                    embeddings=embeddings[start:end],
+                    documents=contents[start:end],
+                    metadatas=metadatas[start:end]
+                )
 
         logger.info(f"Added {len(ids)} documents to vector store")
         return ids
 
-    async def search(self, query: str, top_k: int = 5, where: dict = None) -> list[dict]:
-        """Search for similar documents."""
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        where: dict = None,
+        include: tuple[str, ...] = SEARCH_FIELDS,
+    ) -> list[dict]:
+        """Search for similar documents.
+
+        ``include`` selects the Chroma fields to read. Results carry
+        ``content``, ``metadata`` and ``score`` only for the fields asked for,
+        so callers needing ids and scores can skip the document bodies.
+        """
         await self.initialize()
 
         query_embedding = await self._get_embedding(query)
 
         async with self._lock:
-            results = self._collection.query(
+            results = await asyncio.to_thread(
+                self._collection.query,
                 query_embeddings=[query_embedding],
                 n_results=top_k,
                 where=where,
-                include=["documents", "metadatas", "distances"]
+                include=list(include)
             )
 
         # Format results
         formatted = []
         if results["ids"] and results["ids"][0]:
+            documents = results.get("documents")
+            metadatas = results.get("metadatas")
+            distances = results.get("distances")
             for i, doc_id in enumerate(results["ids"][0]):
-                distance = results["distances"][0][i] if results["distances"] else 0
-                # Convert cosine distance to similarity score (0-1)
-                similarity = 1 - distance
-
-                formatted.append({
-                    "id": doc_id,
-                    "content": results["documents"][0][i] if results["documents"] else "",
-                    "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
-                    "score": round(similarity, 4),
-                })
+                entry = {"id": doc_id}
+                if "documents" in include:
+                    entry["content"] = documents[0][i] if documents else ""
+                if "metadatas" in include:
+                    entry["metadata"] = metadatas[0][i] if metadatas else {}
+                if "distances" in include:
+                    distance = distances[0][i] if distances else 0
+                    # Convert cosine distance to similarity score (0-1)
+                    entry["score"] = round(1 - distance, 4)
+                formatted.append(entry)
 
         return formatted
 
+    async def get(self, ids: list[str]) -> list[dict]:
+        """Fetch documents by ID, without embedding a query."""
+        if not ids:
+            return []
+        await self.initialize()
+
+        async with self._lock:
+            results = await asyncio.to_thread(
+                self._collection.get,
+                ids=ids,
+                include=["documents", "metadatas"]
+            )
+
+        found = results["ids"]
+        documents = results.get("documents") or [""] * len(found)
+        metadatas = results.get("metadatas") or [{}] * len(found)
+        return [
+            {"id": doc_id, "content": document or "", "metadata": metadata or {}}
+            for doc_id, document, metadata in zip(found, documents, metadatas)
+        ]
+
     async def delete(self, doc_id: str) -> bool:
         """Delete a document by ID."""
         await self.initialize()
 
         async with self._lock:
             try:
-                self._collection.delete(ids=[doc_id])
+                await asyncio.to_thread(self._collection.delete, ids=[doc_id])
                 return True
             except Exception as e:
                 logger.error(f"Failed to delete {doc_id}: {e}")
@@ -215,9 +271,11 @@ class VectorStore:
         await self.initialize()
 
         async with self._lock:
-            self._client.delete_collection(self._collection.name)
-            self._collection = self._client.create_collection(
-                name=self._collection.name,
+            name = self._collection.name
+            await asyncio.to_thread(self._client.delete_collection, name)
+            self._collection = await asyncio.to_thread(
+                self._client.create_collection,
+                name=name,
                 metadata={"hnsw:space": "cosine"}
             )
 
@@ -226,7 +284,7 @@ class VectorStore:
     async def count(self) -> int:
         """Get the number of documents in the store."""
         await self.initialize()
-        return self._collection.count()
+        return await asyncio.to_thread(self._collection.count)
 
     async def _get_embedding(self, text: str) -> list[float]:
         """Generate embedding for text."""
@@ -234,6 +292,14 @@ class VectorStore:
             return await self._embedding_fn.embed(text)
         return self._embedding_fn.embed(text)
 
+    async def _get_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for several texts in one batched call."""
+        embed_many = self._embedding_fn.embed_many
+        if asyncio.iscoroutinefunction(embed_many):
+            return await embed_many(texts)
+        # Model inference is CPU/network bound; keep it off the event loop
+        return await asyncio.to_thread(embed_many, texts)
+
 
 # ── Embedding Providers ──────────────────────────────────────
 
@@ -256,6 +322,13 @@ class SentenceTransformerEmbedder:
         embedding = model.encode(text, convert_to_numpy=True)
         return embedding.tolist()
 
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        model = self._get_model()
+        embeddings = model.encode(
+            texts, batch_size=64, convert_to_numpy=True, show_progress_bar=False
+        )
+        return embeddings.tolist()
+
 
 class OpenAIEmbedder:
     """Embedding using OpenAI API."""
@@ -272,6 +345,16 @@ class OpenAIEmbedder:
         )
         return response.data[0].embedding
 
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        embeddings = []
+        for start in range(0, len(texts), OPENAI_MAX_BATCH):
+            response = self.client.embeddings.create(
+                model=self.model,
+                input=texts[start:start + OPENAI_MAX_BATCH]
+            )
+            embeddings.extend(d.embedding for d in response.data)
+        return embeddings
+
 
 class FallbackEmbedder:
     """Simple fallback embedder using TF-IDF-like hashing (not truly semantic)."""
@@ -280,20 +363,20 @@ class FallbackEmbedder:
         self.dimensions = dimensions
 
     def embed(self, text: str) -> list[float]:
-        import hashlib
-        # Create pseudo-embedding by hashing tokens
-        tokens = text.lower().split()
-        embedding = [0.0] * self.dimensions
-
-        for token in tokens:
+        # Create pseudo-embedding by hashing tokens: each md5 byte picks a
+        # bucket. Only the direction survives normalization, so buckets hold
+        # integer hit counts and each distinct token is hashed once.
+        counts = [0] * self.dimensions
+        for token, n in Counter(text.lower().split()).items():
             token_hash = hashlib.md5(token.encode()).digest()
             for i, byte in enumerate(token_hash):
-                idx = (i * 16 + byte) % self.dimensions
-                embedding[idx] += 0.1
+                counts[(i * 16 + byte) % self.dimensions] += n
 
         # Normalize
-        magnitude = sum(x * x for x in embedding) ** 0.5
-        if magnitude > 0:
-            embedding = [x / magnitude for x in embedding]
+        magnitude = math.sqrt(sum(c * c for c in counts))
+        if magnitude == 0:
+            return [0.0] * self.dimensions
+        return [c / magnitude for c in counts]
 
-        return embedding
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed(text) for text in texts]
@@ -4,8 +4,12 @@ Creates ephemeral, isolated containers for safe code execution.
 """
 
 import asyncio
+import io
 import logging
 import os
+import posixpath
+import tarfile
+import tempfile
 import uuid
 from pathlib import Path
 from typing import Optional
@@ -14,6 +18,41 @@ from openclaw.config.settings import get_settings
 
 logger = logging.getLogger("openclaw.sandbox.container")
 
+# Archives for put_archive stay in memory up to this size, then spill to disk
+ARCHIVE_SPOOL_BYTES = 4 * 1024 * 1024
+
+# uid/gid of "nobody", the user sandbox commands run as
+SANDBOX_UID = 65534
+
+# Mount point of the session workspace inside sandbox containers
+SANDBOX_WORKSPACE = "/workspace"
+
+
+def _single_file_archive(
+    name: str, fileobj, size: int, owner: int = 0
+) -> tempfile.SpooledTemporaryFile:
+    """
+    Tar one file streamed from fileobj, without holding it all in memory.
+
+    A relative name with directories gets an entry for each parent, owned
+    by owner, so missing directories are not created as root on unpack.
+    """
+    archive = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_BYTES)
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        parts = name.split("/")[:-1]
+        for depth in range(1, len(parts) + 1):
+            dirinfo = tarfile.TarInfo(name="/".join(parts[:depth]))
+            dirinfo.type = tarfile.DIRTYPE
+            dirinfo.mode = 0o755
+            dirinfo.uid = dirinfo.gid = owner
+            tar.addfile(dirinfo)
+        tarinfo = tarfile.TarInfo(name=name)
+        tarinfo.size = size
+        tarinfo.uid = tarinfo.gid = owner
+        tar.addfile(tarinfo, fileobj)
+    archive.seek(0)
+    return archive
+
 
 class ContainerManager:
     """
@@ -25,12 +64,17 @@ class ContainerManager:
     - Network isolation
     - Volume mounting for workspace
     - Automatic cleanup
+    - Warm pool of pre-started containers for new sessions
     """
 
     def __init__(self):
         self.settings = get_settings()
         self._docker_client = None
         self._active_containers: dict[str, str] = {}  # session_id -> container_id
+        self._container_sessions: dict[str, str] = {}  # container_id -> session_id
+        # Started containers not yet bound to a session
+        self._warm: list[str] = []
+        self._warm_task: Optional[asyncio.Task] = None
         self._initialized = False
 
     async def initialize(self):
@@ -40,8 +84,10 @@ class ContainerManager:
 
         try:
             import docker
-            self._docker_client = docker.from_env()
-            self._docker_client.ping()
+            # Both talk to the Docker socket; keep them off the event loop
+            client = await asyncio.to_thread(docker.from_env)
+            await asyncio.to_thread(client.ping)
+            self._docker_client = client
             self._initialized = True
             logger.info("Container manager initialized")
         except ImportError:
@@ -55,6 +101,9 @@ class ContainerManager:
         """
         Create a new sandbox container.
 
+        A pre-started container from the warm pool is used when one is
+        available; otherwise a container is created and started.
+
         Args:
             session_id: Optional session ID to associate with container
 
@@ -64,55 +113,109 @@ class ContainerManager:
         await self.initialize()
 
         session_id = session_id or str(uuid.uuid4())[:8]
-        container_name = f"openclaw-sandbox-{session_id}"
+
+        try:
+            container_id = await self._take_warm()
+            if container_id is None:
+                container = await asyncio.to_thread(self._start_container, session_id)
+                container_id = container.id
+            self._active_containers[session_id] = container_id
+            self._container_sessions[container_id] = session_id
+
+            logger.info(f"Created sandbox container for session {session_id}")
+            return container_id
+
+        except Exception as e:
+            logger.error(f"Failed to create sandbox container: {e}")
+            raise
+        finally:
+            self._refill_warm_pool()
+
+    def _start_container(self, sandbox_id: str):
+        """Create and start a sandbox container (blocking; run in a thread)."""
+        container_name = f"openclaw-sandbox-{sandbox_id}"
 
         # Get sandbox configuration
         image = self.settings.get("sandbox.image", "python:3.11-slim")
         memory_limit = self.settings.get("sandbox.memory_limit", "256m")
         cpu_quota = self.settings.get("sandbox.cpu_quota", 50000)  # 50% of one CPU
-        timeout = self.settings.get("sandbox.timeout", 30)
 
         # Create workspace directory
         workspace_base = Path(self.settings.get("sandbox.workspace", "/tmp/openclaw-sandbox"))
         workspace_base.mkdir(parents=True, exist_ok=True)
-        workspace = workspace_base / session_id
+        workspace = workspace_base / sandbox_id
         workspace.mkdir(exist_ok=True)
 
-        try:
-            container = self._docker_client.containers.create(
-                image=image,
-                name=container_name,
-                command="sleep infinity",  # Keep alive until killed
-                detach=True,
-                mem_limit=memory_limit,
-                cpu_quota=cpu_quota,
-                network_mode="none",  # No network access by default
-                security_opt=["no-new-privileges:true"],
-                cap_drop=["ALL"],  # Drop all capabilities
-                read_only=False,  # Allow writes to mounted workspace
-                volumes={
-                    str(workspace): {"bind": "/workspace", "mode": "rw"}
-                },
-                working_dir="/workspace",
-                environment={
-                    "SANDBOX": "1",
-                    "SESSION_ID": session_id,
-                },
-                labels={
-                    "openclaw.sandbox": "true",
-                    "openclaw.session": session_id,
-                }
-            )
+        container = self._docker_client.containers.create(
+            image=image,
+            name=container_name,
+            command="sleep infinity",  # Keep alive until killed
+            detach=True,
+            mem_limit=memory_limit,
+            cpu_quota=cpu_quota,
+            network_mode="none",  # No network access by default
+            security_opt=["no-new-privileges:true"],
+            cap_drop=["ALL"],  # Drop all capabilities
+            read_only=False,  # Allow writes to mounted workspace
+            volumes={
+                str(workspace): {"bind": "/workspace", "mode": "rw"}
+            },
+            working_dir="/workspace",
+            environment={
+                "SANDBOX": "1",
+                "SESSION_ID": sandbox_id,
+            },
+            labels={
+                "openclaw.sandbox": "true",
+                "openclaw.session": sandbox_id,
+            }
+        )
 
-            container.start()
-            self._active_containers[session_id] = container.id
+        container.start()
+        return container
 
-            logger.info(f"Created sandbox container: {container_name}")
-            return container.id
+    # ── Warm pool ────────────────────────────────────────────
 
-        except Exception as e:
-            logger.error(f"Failed to create sandbox container: {e}")
-            raise
+    async def _take_warm(self) -> Optional[str]:
+        """Pop a still-running warm container, or None if the pool is empty."""
+        while self._warm:
+            container_id = self._warm.pop()
+            try:
+                container = await asyncio.to_thread(
+                    self._docker_client.containers.get, container_id
+                )
+                if container.status == "running":
+                    return container_id
+            except Exception as e:
+                logger.debug(f"Discarding warm container {container_id}: {e}")
+        return None
+
+    def _refill_warm_pool(self):
+        """Top the warm pool back up in the background."""
+        size = self.settings.get("sandbox.warm_pool_size", 0)
+        if len(self._warm) >= size or (self._warm_task and not self._warm_task.done()):
+            return
+        self._warm_task = asyncio.get_running_loop().create_task(self._fill_warm_pool(size))
+
+    async def _fill_warm_pool(self, size: int):
+        while len(self._warm) < size:
+            start = asyncio.ensure_future(
+                asyncio.to_thread(self._start_container, str(uuid.uuid4())[:8])
+            )
+            try:
+                container = await asyncio.shield(start)
+            except asyncio.CancelledError:
+                # Cancelling can't stop the thread; remove what it creates
+                try:
+                    container = await start
+                    await asyncio.to_thread(container.remove, force=True)
+                except Exception as e:
+                    logger.warning(f"Failed to remove cancelled warm container: {e}")
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to start warm sandbox container: {e}")
+                return
+            self._warm.append(container.id)
 
     async def execute_in_sandbox(
         self,
@@ -137,11 +240,9 @@ class ContainerManager:
 
         timeout = timeout or self.settings.get("sandbox.timeout", 30)
 
-        try:
+        def run():
             container = self._docker_client.containers.get(container_id)
-
-            # Execute command
-            exec_result = container.exec_run(
+            return container.exec_run(
                 cmd=["sh", "-c", command],
                 user=user,
                 workdir="/workspace",
@@ -149,6 +250,10 @@ class ContainerManager:
                 environment={"PATH": "/usr/local/bin:/usr/bin:/bin"},
             )
 
+        try:
+            # Execute command
+            exec_result = await asyncio.to_thread(run)
+
             stdout = exec_result.output[0] if exec_result.output[0] else b""
             stderr = exec_result.output[1] if exec_result.output[1] else b""
 
@@ -185,11 +290,26 @@ class ContainerManager:
         Returns:
             Execution result
         """
-        # Write code to a temporary file in the container
-        escaped_code = code.replace("'", "'\\''")
-        write_cmd = f"echo '{escaped_code}' > /workspace/_script.py"
+        await self.initialize()
+
+        # Write the script with put_archive: no shell quoting, no extra exec
+        script = code.encode("utf-8")
+
+        def write_script():
+            container = self._docker_client.containers.get(container_id)
+            with _single_file_archive("_script.py", io.BytesIO(script), len(script)) as archive:
+                container.put_archive("/workspace", archive)
 
-        await self.execute_in_sandbox(container_id, write_cmd)
+        try:
+            await asyncio.to_thread(write_script)
+        except Exception as e:
+            logger.error(f"Failed to write script to sandbox: {e}")
+            return {
+                "success": False,
+                "exit_code": -1,
+                "stdout": "",
+                "stderr": str(e),
+            }
 
         # Execute the Python script
         return await self.execute_in_sandbox(
@@ -202,57 +322,82 @@ class ContainerManager:
         """Copy a file into the sandbox container."""
         await self.initialize()
 
-        import tarfile
-        import io
+        container = await asyncio.to_thread(self._docker_client.containers.get, container_id)
+
+        def build_archive():
+            # The file is copied into the tar in chunks, never read whole
+            with open(local_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                return _single_file_archive(Path(container_path).name, f, size)
+
+        with await asyncio.to_thread(build_archive) as archive:
+            await asyncio.to_thread(
+                container.put_archive, str(Path(container_path).parent), archive
+            )
+
+    async def put_file(self, container_id: str, container_path: str, data: bytes) -> bool:
+        """
+        Write bytes to a file under the sandbox workspace.
+
+        The file and any missing parent directories are owned by the
+        sandbox user so later commands can modify them.
 
-        container = self._docker_client.containers.get(container_id)
+        Returns:
+            Whether Docker accepted the archive
 
-        # Create tar archive of the file
-        file_data = Path(local_path).read_bytes()
-        tarstream = io.BytesIO()
-        tar = tarfile.open(fileobj=tarstream, mode='w')
-        tarinfo = tarfile.TarInfo(name=Path(container_path).name)
-        tarinfo.size = len(file_data)
-        tar.addfile(tarinfo, io.BytesIO(file_data))
-        tar.close()
-        tarstream.seek(0)
+        Raises:
+            ValueError: If container_path resolves outside the workspace
+        """
+        path = posixpath.normpath(container_path)
+        if not path.startswith(SANDBOX_WORKSPACE + "/"):
+            raise ValueError(f"Path is outside {SANDBOX_WORKSPACE}: {container_path}")
+        # Unpacked at the workspace, so members never name anything above it
+        name = path[len(SANDBOX_WORKSPACE) + 1:]
 
-        container.put_archive(str(Path(container_path).parent), tarstream)
+        await self.initialize()
+
+        def write():
+            container = self._docker_client.containers.get(container_id)
+            with _single_file_archive(name, io.BytesIO(data), len(data), SANDBOX_UID) as archive:
+                return container.put_archive(SANDBOX_WORKSPACE, archive)
+
+        return await asyncio.to_thread(write)
 
     async def copy_from_sandbox(self, container_id: str, container_path: str) -> bytes:
         """Copy a file from the sandbox container."""
         await self.initialize()
 
-        import tarfile
-        import io
-
-        container = self._docker_client.containers.get(container_id)
+        def fetch():
+            container = self._docker_client.containers.get(container_id)
+            bits, _ = container.get_archive(container_path)
+            tarstream = io.BytesIO()
+            for chunk in bits:
+                tarstream.write(chunk)
+            tarstream.seek(0)
 
-        bits, _ = container.get_archive(container_path)
-        tarstream = io.BytesIO()
-        for chunk in bits:
-            tarstream.write(chunk)
-        tarstream.seek(0)
+            tar = tarfile.open(fileobj=tarstream, mode='r')
+            member = tar.getmembers()[0]
+            f = tar.extractfile(member)
+            return f.read() if f else b""
 
-        tar = tarfile.open(fileobj=tarstream, mode='r')
-        member = tar.getmembers()[0]
-        f = tar.extractfile(member)
-        return f.read() if f else b""
+        return await asyncio.to_thread(fetch)
 
     async def destroy_sandbox(self, container_id: str):
         """Destroy a sandbox container."""
         await self.initialize()
 
-        try:
+        def stop_and_remove():
             container = self._docker_client.containers.get(container_id)
             container.stop(timeout=5)
             container.remove(force=True)
 
+        try:
+            await asyncio.to_thread(stop_and_remove)
+
             # Remove from active containers
-            for session_id, cid in list(self._active_containers.items()):
-                if cid == container_id:
-                    del self._active_containers[session_id]
-                    break
+            session_id = self._container_sessions.pop(container_id, None)
+            if session_id is not None:
+                self._active_containers.pop(session_id, None)
 
             logger.info(f"Destroyed sandbox container: {container_id}")
 
@@ -263,20 +408,34 @@ class ContainerManager:
         """Cleanup all sandbox containers."""
         await self.initialize()
 
-        # Find all openclaw sandbox containers
-        containers = self._docker_client.containers.list(
-            filters={"label": "openclaw.sandbox=true"},
-            all=True,
-        )
-
-        for container in containers:
+        if self._warm_task:
+            self._warm_task.cancel()
             try:
-                container.stop(timeout=5)
-                container.remove(force=True)
-            except Exception as e:
-                logger.warning(f"Failed to cleanup container {container.id}: {e}")
+                await self._warm_task
+            except asyncio.CancelledError:
+                pass
+            self._warm_task = None
+
+        def remove_all():
+            # Find all openclaw sandbox containers
+            containers = self._docker_client.containers.list(
+                filters={"label": "openclaw.sandbox=true"},
+                all=True,
+            )
+
+            for container in containers:
+                try:
+                    container.stop(timeout=5)
+                    container.remove(force=True)
+                except Exception as e:
+                    logger.warning(f"Failed to cleanup container {container.id}: {e}")
+            return containers
+
+        containers = await asyncio.to_thread(remove_all)
 
         self._active_containers.clear()
+        self._container_sessions.clear()
+        self._warm.clear()
         logger.info(f"Cleaned up {len(containers)} sandbox containers")
 
     async def get_sandbox_for_session(self, session_id: str) -> Optional[str]:
@@ -284,10 +443,12 @@ class ContainerManager:
         if session_id in self._active_containers:
             # Verify container still exists
             try:
-                self._docker_client.containers.get(self._active_containers[session_id])
+                await asyncio.to_thread(
+                    self._docker_client.containers.get, self._active_containers[session_id]
+                )
                 return self._active_containers[session_id]
             except Exception:
-                del self._active_containers[session_id]
+                self._container_sessions.pop(self._active_containers.pop(session_id), None)
 
         return await self.create_sandbox(session_id)
 
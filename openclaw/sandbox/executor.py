@@ -4,10 +4,12 @@ Automatically routes dangerous operations to isolated containers.
 Includes Self-Healing Code Loop: auto-corrects code errors via LLM retry.
 """
 
-import base64
+import asyncio
 import logging
+import posixpath
 import re
 import time
+from functools import lru_cache
 from typing import Optional, TYPE_CHECKING
 
 from openclaw.config.settings import get_settings
@@ -19,26 +21,44 @@ if TYPE_CHECKING:
 logger = logging.getLogger("openclaw.sandbox.executor")
 
 
-# Patterns that indicate dangerous commands needing sandboxing
+# Patterns that indicate dangerous commands needing sandboxing.
+# "X, then later Y" checks are written \A(?>.*?X).*Y rather than X.*Y: the
+# atomic group commits to the first X, which matches exactly when X.*Y does,
+# but never retries .* from every later X (quadratic on long commands).
 DANGEROUS_PATTERNS = [
     r"rm\s+(-[rRf]+\s+)?/",  # rm with root paths
-    r"rm\s+.*\*",  # rm with wildcards
+    r"\A(?>.*?rm\s+).*\*",  # rm with wildcards
     r"dd\s+",  # dd command
     r"mkfs",  # filesystem creation
     r">\s*/dev/",  # writing to devices
     r"chmod\s+(-R\s+)?[0-7]{3}\s+/",  # chmod on root
     r"chown\s+",  # ownership changes
-    r"wget\s+.*\|\s*(sh|bash)",  # wget piped to shell
-    r"curl\s+.*\|\s*(sh|bash)",  # curl piped to shell
+    r"\A(?>.*?wget\s+).*\|\s*(sh|bash)",  # wget piped to shell
+    r"\A(?>.*?curl\s+).*\|\s*(sh|bash)",  # curl piped to shell
     r"eval\s+",  # eval command
-    r"\$\(.*\)",  # command substitution
-    r"`.*`",  # backtick command substitution
-    r"python.*-c\s+",  # python inline code
-    r"perl.*-e\s+",  # perl inline code
-    r"ruby.*-e\s+",  # ruby inline code
-    r"node.*-e\s+",  # node inline code
+    r"\A(?>.*?\$\().*\)",  # command substitution
+    r"\A(?>.*?`).*`",  # backtick command substitution
+    r"\A(?>.*?python).*-c\s+",  # python inline code
+    r"\A(?>.*?perl).*-e\s+",  # perl inline code
+    r"\A(?>.*?ruby).*-e\s+",  # ruby inline code
+    r"\A(?>.*?node).*-e\s+",  # node inline code
 ]
 
+# All dangerous patterns fused into one compiled alternation, so a command
+# is scanned once; group p<i> tells which pattern fired. DOTALL lets ".*"
+# cross line continuations ("rm -rf dir \<newline> *").
+_DANGEROUS_RE = re.compile(
+    "|".join(f"(?P<p{i}>{p})" for i, p in enumerate(DANGEROUS_PATTERNS)),
+    re.IGNORECASE | re.DOTALL,
+)
+_PIPE_TO_SHELL_RE = re.compile(r"\|\s*(bash|sh|zsh)\b")
+# A network tool and a command chain/substitution anywhere in the command,
+# in either order (substring checks, as "nc" also matches inside words)
+_NET_EXEC_RE = re.compile(
+    r"\A(?=.*?(?:wget|curl|nc|netcat))(?=.*?(?:\||;|&&|\$\(|`))",
+    re.IGNORECASE | re.DOTALL,
+)
+
 # Commands that are always safe (don't need sandboxing)
 SAFE_COMMANDS = [
     "ls", "pwd", "whoami", "date", "echo", "cat", "head", "tail",
@@ -47,6 +67,35 @@ SAFE_COMMANDS = [
     "docker ps", "docker images",
 ]
 
+
+def _index_safe_commands(commands: list[str]) -> tuple[frozenset, dict[str, frozenset]]:
+    """Split safe commands into bare words and first word -> allowed subcommands."""
+    single = set()
+    multi: dict[str, set] = {}
+    for command in commands:
+        first, _, sub = command.partition(" ")
+        if sub:
+            multi.setdefault(first, set()).add(sub)
+        else:
+            single.add(first)
+    return frozenset(single), {first: frozenset(subs) for first, subs in multi.items()}
+
+
+# Safe-command lookup by whole words: one set probe instead of a prefix scan
+_SAFE_SINGLE, _SAFE_MULTI = _index_safe_commands(SAFE_COMMANDS)
+
+# Tools that may need sandboxing; every other tool runs directly
+_SANDBOX_CANDIDATE_TOOLS = frozenset({
+    "shell", "python", "code", "execute_code", "write_file", "write",
+})
+
+# Writes under these paths are sandboxed (a tuple, so one startswith call)
+_SENSITIVE_PREFIXES = (
+    "/etc/", "/bin/", "/sbin/", "/usr/bin/", "/usr/sbin/",
+    "/boot/", "/root/", "/sys/", "/proc/", "/dev/",
+    "~/.ssh/", "~/.bashrc", "~/.profile",
+)
+
 # Error patterns that are good candidates for self-healing
 HEALABLE_ERROR_PATTERNS = [
     r"ModuleNotFoundError",
@@ -63,6 +112,56 @@ HEALABLE_ERROR_PATTERNS = [
     r"IndentationError",
 ]
 
+# One scan of the error text instead of a re.search per pattern
+_HEALABLE_RE = re.compile("|".join(HEALABLE_ERROR_PATTERNS))
+
+# Optional opening fence (```python / ```py / ```) and optional closing fence
+_CODE_FENCE_RE = re.compile(r"(?:```(?:python|py)?)?(.*?)(?:```)?", re.DOTALL)
+
+
+# Retries and agent loops repeat the same commands; classification is a
+# pure function of the command, so results are memoized
+CLASSIFY_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def _classify_command(command: str) -> tuple[bool, Optional[str]]:
+    """Return (dangerous, matched dangerous pattern or None) for a shell command."""
+    command_lower = command.lower().strip()
+
+    # Check for safe commands (matched on whole words, so "ls;rm ..." isn't "ls")
+    words = command_lower.split(None, 2)
+    if words and (
+        words[0] in _SAFE_SINGLE
+        or (len(words) > 1 and words[1] in _SAFE_MULTI.get(words[0], ()))
+    ):
+        return False, None
+
+    # Check dangerous patterns
+    match = _DANGEROUS_RE.search(command)
+    if match:
+        return True, DANGEROUS_PATTERNS[int(match.lastgroup[1:])]
+
+    # Check for pipe to shell
+    if _PIPE_TO_SHELL_RE.search(command):
+        return True, None
+
+    # Check for network + execution
+    if _NET_EXEC_RE.search(command):
+        return True, None
+
+    return False, None
+
+
+# Characters of program output kept in each self-healing trace entry
+TRACE_PREVIEW_CHARS = 500
+
+
+def _preview(text: str, limit: int = TRACE_PREVIEW_CHARS) -> str:
+    """Shorten text to limit characters, marking the cut with an ellipsis."""
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
 SELF_HEALING_PROMPT = """You generated the following Python code that failed with an error.
 
 ## Sandbox Environment
@@ -115,6 +214,8 @@ class SandboxExecutor:
         self._max_heal_attempts = self.settings.get(
             "sandbox.self_healing.max_attempts", 3
         )
+        # Candidate fixes requested concurrently per attempt
+        self._heal_fanout = max(1, self.settings.get("sandbox.self_healing.fanout", 1))
 
     async def execute(self, tool_name: str, args: dict, session_id: str = None) -> dict:
         """
@@ -153,10 +254,10 @@ class SandboxExecutor:
         else:
             return await self._execute_direct(tool_name, args)
 
-    async def _get_sandbox_context(self, session_id: str) -> str:
+    async def _get_sandbox_context(self, session_id: str, container_id: str = None) -> str:
         """Query the sandbox container for environment info (OS, Python, packages)."""
         try:
-            container_id = await self.container_manager.get_sandbox_for_session(
+            container_id = container_id or await self.container_manager.get_sandbox_for_session(
                 session_id or "default"
             )
             # Run a single command to gather OS, Python version, and installed packages
@@ -180,10 +281,7 @@ class SandboxExecutor:
         """Check if an error is a candidate for self-healing."""
         if not error:
             return False
-        for pattern in HEALABLE_ERROR_PATTERNS:
-            if re.search(pattern, error):
-                return True
-        return False
+        return _HEALABLE_RE.search(error) is not None
 
     async def _self_healing_loop(
         self,
@@ -198,8 +296,9 @@ class SandboxExecutor:
         Flow:
         1. Code fails in sandbox with an error
         2. Error + code sent to LLM: "Fix this, here's the error"
-        3. LLM returns corrected code
-        4. Re-execute in sandbox
+        3. LLM returns corrected code (fanout > 1 asks for several fixes at
+           once, at rising temperatures)
+        4. Re-execute in sandbox, one candidate after another
         5. Repeat up to max_attempts times
 
         Returns the last result (success or final failure with healing trace).
@@ -218,12 +317,25 @@ class SandboxExecutor:
         })
 
         logger.info(
-            f"Self-Healing activated: error='{current_error[:100]}...' "
+            f"Self-Healing activated: error='{_preview(current_error, 100)}' "
             f"max_attempts={self._max_heal_attempts}"
         )
 
+        # Pin every attempt to the session's container, resolved once
+        try:
+            container_id = await self.container_manager.get_sandbox_for_session(
+                session_id or "default"
+            )
+        except Exception as e:
+            logger.debug(f"Self-Healing: could not pin sandbox container: {e}")
+            container_id = None
+
         # Gather sandbox environment context once (reused across attempts)
-        sandbox_context = await self._get_sandbox_context(session_id)
+        sandbox_context = await self._get_sandbox_context(session_id, container_id)
+
+        # Retries differ only in the code, so one args copy is reused
+        code_key = "code" if "code" in original_args else "content"
+        corrected_args = dict(original_args)
 
         for attempt in range(1, self._max_heal_attempts + 1):
             # Ask the LLM to fix the code
@@ -235,14 +347,21 @@ class SandboxExecutor:
                 sandbox_context=sandbox_context,
             )
 
-            try:
-                llm_response = await self.brain.generate(
-                    messages=[{"role": "user", "content": fix_prompt}],
-                    max_tokens=4096,
-                    temperature=0.2,  # Low temperature for precise fixes
-                )
-                corrected_code = llm_response.get("content", "").strip()
-            except Exception as e:
+            # Low temperature for precise fixes; extra candidates explore more
+            responses = await asyncio.gather(
+                *(
+                    self.brain.generate(
+                        messages=[{"role": "user", "content": fix_prompt}],
+                        max_tokens=4096,
+                        temperature=0.2 + 0.2 * i,
+                    )
+                    for i in range(self._heal_fanout)
+                ),
+                return_exceptions=True,
+            )
+            failures = [r for r in responses if isinstance(r, BaseException)]
+            if len(failures) == len(responses):
+                e = failures[0]
                 logger.error(f"Self-Healing: LLM call failed on attempt {attempt}: {e}")
                 healing_trace.append({
                     "attempt": attempt,
@@ -252,7 +371,15 @@ class SandboxExecutor:
                 })
                 break
 
-            if not corrected_code or corrected_code == current_code:
+            candidates = []
+            for response in responses:
+                if isinstance(response, BaseException):
+                    continue
+                code = response.get("content", "").strip()
+                if code and code != current_code and code not in candidates:
+                    candidates.append(code)
+
+            if not candidates:
                 logger.warning(f"Self-Healing: LLM returned identical or empty code on attempt {attempt}")
                 healing_trace.append({
                     "attempt": attempt,
@@ -261,40 +388,42 @@ class SandboxExecutor:
                 })
                 break
 
-            # Strip markdown fences if the LLM wrapped it anyway
-            corrected_code = self._strip_code_fences(corrected_code)
+            # Candidates share the session's workspace, so they run in turn
+            for corrected_code in candidates:
+                # Strip markdown fences if the LLM wrapped it anyway
+                corrected_code = self._strip_code_fences(corrected_code)
 
-            # Re-execute the corrected code
-            corrected_args = {**original_args}
-            if "code" in corrected_args:
-                corrected_args["code"] = corrected_code
-            else:
-                corrected_args["content"] = corrected_code
-
-            result = await self._execute_sandboxed(tool_name, corrected_args, session_id)
-
-            healing_trace.append({
-                "attempt": attempt,
-                "type": "retry",
-                "code": corrected_code,
-                "success": result.get("success", False),
-                "error": result.get("error") if not result.get("success") else None,
-                "output": result.get("output", "")[:500] if result.get("success") else None,
-                "timestamp": time.time(),
-            })
-
-            if result.get("success"):
-                logger.info(f"Self-Healing SUCCESS on attempt {attempt}")
-                result["self_healed"] = True
-                result["healing_attempts"] = attempt
-                result["healing_trace"] = healing_trace
-                return result
-
-            # Update for next iteration
-            current_code = corrected_code
-            current_error = result.get("error", "")
+                # Re-execute the corrected code
+                corrected_args[code_key] = corrected_code
+
+                result = await self._execute_sandboxed(
+                    tool_name, corrected_args, session_id, container_id=container_id
+                )
+
+                healing_trace.append({
+                    "attempt": attempt,
+                    "type": "retry",
+                    "code": corrected_code,
+                    "success": result.get("success", False),
+                    "error": result.get("error") if not result.get("success") else None,
+                    "output": (
+                        _preview(result.get("output") or "") if result.get("success") else None
+                    ),
+                    "timestamp": time.time(),
+                })
+
+                if result.get("success"):
+                    logger.info(f"Self-Healing SUCCESS on attempt {attempt}")
+                    result["self_healed"] = True
+                    result["healing_attempts"] = attempt
+                    result["healing_trace"] = healing_trace
+                    return result
+
+                # Update for the next candidate or attempt
+                current_code = corrected_code
+                current_error = result.get("error", "")
             logger.warning(
-                f"Self-Healing attempt {attempt} failed: {current_error[:100]}..."
+                f"Self-Healing attempt {attempt} failed: {_preview(current_error, 100)}"
             )
 
         # All attempts exhausted
@@ -316,18 +445,13 @@ class SandboxExecutor:
     @staticmethod
     def _strip_code_fences(code: str) -> str:
         """Remove markdown code fences from LLM output."""
-        code = code.strip()
-        # Handle all common python fence variants
-        for prefix in ("```python", "```py", "```"):
-            if code.startswith(prefix):
-                code = code[len(prefix):]
-                break
-        if code.endswith("```"):
-            code = code[:-3]
-        return code.strip()
+        return _CODE_FENCE_RE.fullmatch(code.strip()).group(1).strip()
 
     def _needs_sandbox(self, tool_name: str, args: dict) -> bool:
         """Determine if execution needs sandboxing."""
+        if tool_name not in _SANDBOX_CANDIDATE_TOOLS:
+            return False
+
         # Shell commands need careful checking
         if tool_name == "shell":
             command = args.get("command", "")
@@ -346,43 +470,14 @@ class SandboxExecutor:
 
     def _is_dangerous_command(self, command: str) -> bool:
         """Check if a shell command is potentially dangerous."""
-        command_lower = command.lower().strip()
-
-        # Check for safe commands
-        for safe in SAFE_COMMANDS:
-            if command_lower.startswith(safe):
-                return False
-
-        # Check dangerous patterns
-        for pattern in DANGEROUS_PATTERNS:
-            if re.search(pattern, command, re.IGNORECASE):
-                logger.warning(f"Dangerous pattern detected: {pattern}")
-                return True
-
-        # Check for pipe to shell
-        if re.search(r"\|\s*(bash|sh|zsh)\b", command):
-            return True
-
-        # Check for network + execution
-        if any(net in command_lower for net in ["wget", "curl", "nc", "netcat"]):
-            if any(exec_cmd in command_lower for exec_cmd in ["|", ";", "&&", "$(", "`"]):
-                return True
-
-        return False
+        dangerous, pattern = _classify_command(command)
+        if pattern:
+            logger.warning(f"Dangerous pattern detected: {pattern}")
+        return dangerous
 
     def _is_sensitive_path(self, path: str) -> bool:
         """Check if a path is sensitive and should be sandboxed."""
-        sensitive_prefixes = [
-            "/etc/", "/bin/", "/sbin/", "/usr/bin/", "/usr/sbin/",
-            "/boot/", "/root/", "/sys/", "/proc/", "/dev/",
-            "~/.ssh/", "~/.bashrc", "~/.profile",
-        ]
-
-        for prefix in sensitive_prefixes:
-            if path.startswith(prefix):
-                return True
-
-        return False
+        return path.startswith(_SENSITIVE_PREFIXES)
 
     async def _execute_direct(self, tool_name: str, args: dict) -> dict:
         """Execute directly without sandboxing."""
@@ -394,11 +489,17 @@ class SandboxExecutor:
             "error": "No base executor configured",
         }
 
-    async def _execute_sandboxed(self, tool_name: str, args: dict, session_id: str = None) -> dict:
-        """Execute in a sandboxed container."""
+    async def _execute_sandboxed(
+        self,
+        tool_name: str,
+        args: dict,
+        session_id: str = None,
+        container_id: str = None,
+    ) -> dict:
+        """Execute in a sandboxed container (the session's, unless container_id is given)."""
         try:
             # Get or create container for session
-            container_id = await self.container_manager.get_sandbox_for_session(
+            container_id = container_id or await self.container_manager.get_sandbox_for_session(
                 session_id or "default"
             )
 
@@ -474,14 +575,17 @@ class SandboxExecutor:
                 ]
                 patch_script = "\n".join(patch_script_lines)
 
-                # Write patch script via base64 and execute
-                b64_script = base64.b64encode(patch_script.encode("utf-8")).decode("ascii")
-                patch_cmd = (
-                    f"echo '{b64_script}' | base64 -d > /workspace/_patch.py && "
-                    f"python3 /workspace/_patch.py"
-                )
+                # Write the patch script with put_archive and execute it
+                if not await self.container_manager.put_file(
+                    container_id, "/workspace/_patch.py", patch_script.encode("utf-8")
+                ):
+                    return {
+                        "success": False,
+                        "error": "Failed to write patch script",
+                        "sandboxed": True,
+                    }
                 result = await self.container_manager.execute_in_sandbox(
-                    container_id, patch_cmd
+                    container_id, "python3 /workspace/_patch.py"
                 )
                 return {
                     "success": result["success"],
@@ -493,25 +597,26 @@ class SandboxExecutor:
                 }
 
             elif tool_name in ("write_file", "write"):
-                # Write file in sandbox (safe: base64-encode to avoid injection)
+                # Write file in sandbox (safe: streamed as a tar, no shell involved)
                 path = args.get("path", "")
                 content = args.get("content", "")
 
-                # Map to sandbox path
-                sandbox_path = f"/workspace/{path.lstrip('/')}"
-                b64_content = base64.b64encode(content.encode("utf-8")).decode("ascii")
-                write_cmd = (
-                    f"mkdir -p \"$(dirname '{sandbox_path}')\" && "
-                    f"echo '{b64_content}' | base64 -d > '{sandbox_path}'"
-                )
-
-                result = await self.container_manager.execute_in_sandbox(
-                    container_id,
-                    write_cmd,
+                # Map to sandbox path; ".." must not climb out of the workspace
+                sandbox_path = posixpath.normpath(f"/workspace/{path.lstrip('/')}")
+                if not sandbox_path.startswith("/workspace/"):
+                    return {
+                        "success": False,
+                        "error": f"Path escapes the sandbox workspace: {path}",
+                        "sandboxed": True,
+                    }
+
+                written = await self.container_manager.put_file(
+                    container_id, sandbox_path, content.encode("utf-8")
                 )
                 return {
-                    "success": result["success"],
+                    "success": bool(written),
                     "path": sandbox_path,
+                    "error": None if written else f"Failed to write {sandbox_path}",
                     "sandboxed": True,
                 }
 
@@ -4,6 +4,7 @@ All I/O is mocked: no subprocesses, no network.
 """
 
 import asyncio
+import io
 import json
 from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
 
@@ -422,6 +423,12 @@ class TestMCPServerFormatResult:
         assert result["isError"] is True
         assert "bad" in result["content"][0]["text"]
 
+    def test_dict_content_is_pretty_printed(self):
+        server = MCPServer()
+        result = server._format_tool_result({"success": True, "content": {"a": 1}})
+        assert json.loads(result["content"][0]["text"]) == {"a": 1}
+        assert "\n" in result["content"][0]["text"]
+
     def test_non_dict_result(self):
         server = MCPServer()
         result = server._format_tool_result("plain string")
@@ -429,6 +436,31 @@ class TestMCPServerFormatResult:
         assert result["content"][0]["text"] == "plain string"
 
 
+class TestMCPServerRunStdio:
+    @pytest.mark.asyncio
+    async def test_oversized_and_malformed_frames_are_skipped(self):
+        server = MCPServer()
+        server.settings = MagicMock()
+        server.settings.get.side_effect = lambda key, default=None: (
+            64 if key == "mcp.max_frame_bytes" else default
+        )
+        ping = json.dumps({"jsonrpc": "2.0", "id": 7, "method": "prompts/list"})
+        stdin = io.StringIO(
+            '{"jsonrpc": "2.0", "id": 1, "method": "x", "pad": "' + "a" * 200 + '"}\n'
+            + "[1, 2]\n"
+            + "not json\n"
+            + ping + "\n"
+        )
+        stdout = io.StringIO()
+
+        with patch("sys.stdin", stdin), patch("sys.stdout", stdout):
+            await server.run_stdio()
+
+        lines = stdout.getvalue().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["id"] == 7
+
+
 class TestMCPServerStop:
     def test_stop_sets_running_false(self):
         server = MCPServer()
@@ -1,14 +1,18 @@
 """
 Tests for openclaw/memory/ module.
-Covers: ResourceLayer, ItemLayer, CategoryLayer, HybridRetrieval, MemoryManager.
+Covers: ResourceLayer, ItemLayer, CategoryLayer, HybridRetrieval, VectorStore,
+        FaissVectorStore, MemoryManager.
 Uses tmp_path for disk isolation, disables vector store (no ChromaDB needed).
 """
 
 import asyncio
 import json
+import math
+import os
+import threading
 import time
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -17,6 +21,9 @@ from openclaw.memory.item_layer import ItemLayer
 from openclaw.memory.category_layer import CategoryLayer
 from openclaw.memory.retrieval import HybridRetrieval
 from openclaw.memory.manager import MemoryManager
+from openclaw.memory.evolution import CATEGORY_KEYWORDS, EpisodicMemory, MemoryEvolver
+from openclaw.memory.vector_store import FallbackEmbedder, VectorStore
+from openclaw.memory.faiss_store import FaissVectorStore
 
 
 # ── Fixtures ────────────────────────────────────────────────
@@ -82,6 +89,18 @@ def retrieval(item_layer, category_layer):
     return HybridRetrieval(item_layer, category_layer)
 
 
+@pytest.fixture
+def evolver(item_layer, category_layer):
+    return MemoryEvolver(item_layer, category_layer)
+
+
+@pytest.fixture
+def episodic(tmp_path):
+    settings = FakeSettings({"memory.episodic.file": str(tmp_path / "PROJECT_MEMORY.md")})
+    with patch("openclaw.memory.evolution.get_settings", return_value=settings):
+        return EpisodicMemory()
+
+
 @pytest.fixture
 def memory_manager(tmp_path, fake_settings):
     """Build a MemoryManager with all disk ops redirected to tmp_path."""
@@ -144,6 +163,39 @@ class TestResourceLayer:
         assert len(results) == 1
         assert results[0]["type"] == "note"
 
+    @pytest.mark.asyncio
+    async def test_search_does_not_reread_files(self, resource_layer):
+        await resource_layer.store({"type": "note", "content": "Python is great"})
+        await resource_layer.load()
+        # The first search after a load reads each file once...
+        assert len(await resource_layer.search("python")) == 1
+
+        # ...later ones scan the cached text only
+        with patch.object(Path, "read_text", side_effect=AssertionError), \
+             patch.object(Path, "read_bytes", side_effect=AssertionError):
+            results = await resource_layer.search("PYTHON")
+        assert len(results) == 1
+
+    @pytest.mark.asyncio
+    async def test_load_uses_metadata_log(self, resource_layer):
+        rid = await resource_layer.store({"type": "note", "content": "indexed"})
+        # A file from before the metadata log existed
+        legacy = resource_layer.store_path / "res_0_legacy.json"
+        legacy.write_text(json.dumps({"id": "res_0_legacy", "type": "old"}), encoding="utf-8")
+
+        rl2 = ResourceLayer(resource_layer.store_path)
+        await rl2.load()
+        assert rl2.count == 2
+        assert rl2._index["res_0_legacy"]["type"] == "old"
+
+        # The legacy file was logged, so the next load parses no resource files
+        rl3 = ResourceLayer(resource_layer.store_path)
+        with patch("openclaw.memory.resource_layer._json.loads", wraps=json.loads) as loads:
+            await rl3.load()
+        assert rl3.count == 2
+        assert loads.call_count == 2  # one per metadata line
+        assert (await rl3.get(rid))["content"] == "indexed"
+
     @pytest.mark.asyncio
     async def test_search_by_type(self, resource_layer):
         await resource_layer.store({"type": "interaction", "content": "hello"})
@@ -204,11 +256,86 @@ class TestItemLayer:
     async def test_persist_and_reload(self, item_layer, tmp_path, fake_settings):
         await item_layer.store({"content": "persist me", "significance": 0.8})
         await item_layer.store({"content": "and me too", "significance": 0.6})
+        await item_layer.flush()
 
         with patch("openclaw.memory.item_layer.get_settings", return_value=fake_settings):
             il2 = ItemLayer(item_layer.store_path)
         await il2.load()
         assert il2.count == 2
+        # The id index is rebuilt on load
+        first_id = il2.all_items()[0]["id"]
+        assert (await il2.get(first_id))["content"] == "persist me"
+
+    @pytest.mark.asyncio
+    async def test_log_replays_updates_on_reload(self, item_layer, fake_settings):
+        item_id = await item_layer.store({"content": "original text"})
+        await item_layer.update(item_id, {"content": "edited text"})
+        await item_layer.flush()
+        assert not item_layer._index_path.exists()
+        # Simulate a torn final write
+        with item_layer._log_path.open("a", encoding="utf-8") as f:
+            f.write('{"op": "upsert", "ite')
+
+        with patch("openclaw.memory.item_layer.get_settings", return_value=fake_settings):
+            il2 = ItemLayer(item_layer.store_path)
+        await il2.load()
+        assert il2.count == 1
+        assert il2._peek(item_id)["content"] == "edited text"
+
+    @pytest.mark.asyncio
+    async def test_compaction_folds_log_into_snapshot(self, item_layer, fake_settings):
+        with patch("openclaw.memory.item_layer.COMPACT_EVERY", 3):
+            for i in range(2):
+                await item_layer.store({"content": f"item {i}"})
+            await item_layer.flush()
+            assert len(item_layer._log_path.read_text().splitlines()) == 2
+            for i in range(2, 4):
+                await item_layer.store({"content": f"item {i}"})
+            await item_layer.flush()
+        # The second batch crossed the threshold and was folded into the snapshot
+        assert len(json.loads(item_layer._index_path.read_text())) == 4
+        assert not item_layer._log_path.exists()
+
+        await item_layer.store({"content": "item 4"})
+        await item_layer.close()
+        assert not item_layer._log_path.exists()
+        with patch("openclaw.memory.item_layer.get_settings", return_value=fake_settings):
+            il2 = ItemLayer(item_layer.store_path)
+        await il2.load()
+        assert il2.count == 5
+
+    @pytest.mark.asyncio
+    async def test_in_place_changes_reach_the_log(self, item_layer, fake_settings):
+        """Accesses, forgetting and evolution edits survive without compaction."""
+        a = await item_layer.store({"content": "python asyncio eventloop tutorial"})
+        b = await item_layer.store({"content": "asyncio eventloop python example"})
+        await item_layer.flush()
+
+        await item_layer.get(a)
+        item_layer._peek(b)["significance"] = 0.1
+        item_layer.mark_dirty([item_layer._peek(b)])
+        await MemoryEvolver(item_layer, MagicMock())._link()
+        await item_layer.flush()
+        assert not item_layer._index_path.exists()
+
+        with patch("openclaw.memory.item_layer.get_settings", return_value=fake_settings):
+            il2 = ItemLayer(item_layer.store_path)
+        await il2.load()
+        assert il2._peek(a)["access_count"] == 1
+        assert il2._peek(a)["links"] == [b]
+        assert il2._peek(b)["significance"] == 0.1
+
+    @pytest.mark.asyncio
+    async def test_updates_coalesce_into_one_log_line(self, item_layer):
+        item_id = await item_layer.store({"content": "v0"})
+        for i in range(1, 5):
+            await item_layer.update(item_id, {"content": f"v{i}"})
+        assert not item_layer._log_path.exists()
+
+        await item_layer.flush()
+        lines = item_layer._log_path.read_text().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["item"]["content"] == "v4"
 
     @pytest.mark.asyncio
     async def test_search_text(self, item_layer):
@@ -221,6 +348,69 @@ class TestItemLayer:
         # Higher significance item should rank first (scoring includes significance)
         assert "Python" in results[0]["content"]
 
+    @pytest.mark.asyncio
+    async def test_tokens_cached_and_invalidated_on_update(self, item_layer):
+        item_id = await item_layer.store({"content": "Python Asyncio tips"})
+        item = item_layer.all_items()[0]
+        first = item_layer.tokens(item)
+        assert first.lower == "python asyncio tips"
+        assert first.long_word_set == {"python", "asyncio"}
+        assert item_layer.tokens(item) is first
+
+        await item_layer.update(item_id, {"content": "Rust ownership"})
+        assert item_layer.tokens(item).long_words == ("ownership",)
+
+    @pytest.mark.asyncio
+    async def test_semantic_search_enriches_and_counts_access(self, item_layer):
+        iid = await item_layer.store({"content": "vector hit", "significance": 0.7})
+        store = MagicMock()
+        store.search = AsyncMock(return_value=[
+            {"id": iid, "score": 0.9},
+            {"id": "orphan", "score": 0.4},
+        ])
+        store.get = AsyncMock(return_value=[{"id": "orphan", "content": "not indexed", "metadata": {}}])
+        with patch.object(item_layer, "_get_vector_store", AsyncMock(return_value=store)):
+            results = await item_layer.search_semantic("vector")
+
+        # Bodies are skipped in the query and fetched only for the orphan
+        assert store.search.call_args.kwargs["include"] == ("distances",)
+        store.get.assert_awaited_once_with(["orphan"])
+
+        assert results[0]["content"] == "vector hit"
+        assert results[0]["_score"] == 0.9
+        assert results[1] == {"id": "orphan", "content": "not indexed", "_score": 0.4, "_semantic": True}
+        assert item_layer.all_items()[0]["access_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_duplicate_content_embedded_once(self, item_layer):
+        store = MagicMock()
+        store.add = AsyncMock()
+        with patch.object(item_layer, "_get_vector_store", AsyncMock(return_value=store)):
+            await item_layer.store({"content": "recurring log line"})
+            await item_layer.store({"content": "recurring log line"})
+            await item_layer.store({"content": "something else"})
+
+        assert item_layer.count == 3
+        assert store.add.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_items_stored_without_vectors_are_embedded_later(self, item_layer, fake_settings):
+        """Content that failed to embed is retried after a reload."""
+        failing = MagicMock()
+        failing.add = AsyncMock(side_effect=RuntimeError("embedding service down"))
+        with patch.object(item_layer, "_get_vector_store", AsyncMock(return_value=failing)):
+            await item_layer.store({"content": "recurring log line"})
+        await item_layer.flush()
+
+        with patch("openclaw.memory.item_layer.get_settings", return_value=fake_settings):
+            il2 = ItemLayer(item_layer.store_path)
+        await il2.load()
+        store = MagicMock()
+        store.add = AsyncMock()
+        with patch.object(il2, "_get_vector_store", AsyncMock(return_value=store)):
+            await il2.store({"content": "recurring log line"})
+        store.add.assert_awaited_once()
+
     @pytest.mark.asyncio
     async def test_search_by_category(self, item_layer):
         await item_layer.store({"content": "fact A", "category": "knowledge"})
@@ -241,6 +431,15 @@ class TestItemLayer:
         assert sig[0]["content"] == "high"
         assert sig[1]["content"] == "mid"
 
+    @pytest.mark.asyncio
+    async def test_get_significant_limit_keeps_tie_order(self, item_layer):
+        for i in range(10):
+            await item_layer.store({"content": f"tie {i}", "significance": 0.7})
+        await item_layer.store({"content": "top", "significance": 0.95})
+
+        sig = item_layer.get_significant(limit=3)
+        assert [i["content"] for i in sig] == ["top", "tie 0", "tie 1"]
+
     @pytest.mark.asyncio
     async def test_get_recent(self, item_layer):
         await item_layer.store({"content": "old", "created_at": 1000})
@@ -298,6 +497,22 @@ class TestCategoryLayer:
         text = md.read_text()
         assert text.count("duplicate check") == 1
 
+    @pytest.mark.asyncio
+    async def test_organize_dedup_survives_reload(self, tmp_path):
+        store = tmp_path / "categories"
+        item = {"content": "remember across restarts", "category": "general", "significance": 0.5, "created_at": time.time()}
+        layer = CategoryLayer(store)
+        await layer.load()
+        await layer.organize([item])
+        await layer.close()
+        assert (store / "general.hashes").stat().st_size == 8
+
+        reloaded = CategoryLayer(store)
+        await reloaded.load()
+        await reloaded.organize([item])
+        await reloaded.close()
+        assert (store / "general.md").read_text().count("remember across restarts") == 1
+
     @pytest.mark.asyncio
     async def test_organize_dynamic_category(self, category_layer):
         await category_layer.load()
@@ -322,6 +537,34 @@ class TestCategoryLayer:
         assert len(results) == 1
         assert "FastAPI" in results[0]["content"]
 
+    @pytest.mark.asyncio
+    async def test_search_categories_prefix_match(self, category_layer):
+        await category_layer.load()
+        await category_layer.organize([
+            {"content": "FastAPI web framework", "category": "technical", "significance": 0.7, "created_at": time.time()},
+        ])
+        results = category_layer.search_categories("fast")
+        assert len(results) == 1
+        assert results[0]["category"] == "technical"
+
+    @pytest.mark.asyncio
+    async def test_search_index_rebuilt_from_markdown(self, tmp_path):
+        store = tmp_path / "categories"
+        layer = CategoryLayer(store)
+        await layer.load()
+        await layer.organize([
+            {"content": "Kubernetes cluster notes", "category": "technical", "significance": 0.7, "created_at": time.time()},
+        ])
+        await layer.close()
+        (store / "_index.db").unlink()
+
+        reloaded = CategoryLayer(store)
+        await reloaded.load()
+        results = reloaded.search_categories("kubernetes")
+        assert len(results) == 1
+        assert "Kubernetes" in results[0]["content"]
+        await reloaded.close()
+
     @pytest.mark.asyncio
     async def test_get_category_content(self, category_layer):
         await category_layer.load()
@@ -331,6 +574,22 @@ class TestCategoryLayer:
         content = category_layer.get_category_content("projects")
         assert "item alpha" in content
 
+    @pytest.mark.asyncio
+    async def test_get_category_content_cache_tracks_mtime(self, category_layer):
+        await category_layer.load()
+        await category_layer.organize([
+            {"content": "cached entry", "category": "projects", "significance": 0.5, "created_at": time.time()}
+        ])
+        assert "cached entry" in category_layer.get_category_content("projects")
+
+        # An external edit changes the mtime and must be picked up
+        md = category_layer.store_path / "projects.md"
+        md.write_text("# Projets\n\n- hand edited\n", encoding="utf-8")
+        os.utime(md, ns=(md.stat().st_atime_ns, md.stat().st_mtime_ns + 1_000_000))
+        content = category_layer.get_category_content("projects")
+        assert "hand edited" in content
+        assert "cached entry" not in content
+
     @pytest.mark.asyncio
     async def test_get_category_content_nonexistent(self, category_layer):
         content = category_layer.get_category_content("does_not_exist")
@@ -354,8 +613,55 @@ class TestCategoryLayer:
 
         text_after = md.read_text()
         assert "archived" in text_after.lower()
+        # Highest-significance entries are the ones kept
+        assert "sig:0.9" in text_after
+        assert "sig:0.3" not in text_after
         archive = category_layer.store_path / "big_cat_archive.md"
         assert archive.exists()
+        # Archived entries drop out of the search index
+        assert len(category_layer.search_categories("entry number", limit=200)) == 50
+
+    @pytest.mark.asyncio
+    async def test_evolve_keeps_entries_organized_mid_consolidation(self, category_layer):
+        await category_layer.load()
+        await category_layer.organize([
+            {"content": f"Entry number {i} with enough text", "category": "big_cat",
+             "significance": 0.5, "created_at": time.time()}
+            for i in range(110)
+        ])
+        late = {"content": "late arrival entry", "category": "big_cat",
+                "significance": 0.99, "created_at": time.time()}
+
+        read = threading.Event()
+        original_read = category_layer.get_category_content
+
+        def slow_read(cat_id):
+            content = original_read(cat_id)
+            read.set()
+            time.sleep(0.1)  # hold the window between read and rewrite open
+            return content
+
+        async def organize_after_read():
+            while not read.is_set():
+                await asyncio.sleep(0.005)
+            await category_layer.organize([late])
+
+        with patch.object(category_layer, "get_category_content", side_effect=slow_read):
+            await asyncio.gather(category_layer.evolve(), organize_after_read())
+
+        md = category_layer.store_path / "big_cat.md"
+        assert "late arrival entry" in md.read_text()
+        assert category_layer.search_categories("late arrival")
+
+    @pytest.mark.asyncio
+    async def test_evolve_skips_small_categories_without_reading(self, category_layer):
+        await category_layer.load()
+        await category_layer.organize([
+            {"content": "just one entry", "category": "knowledge", "significance": 0.5, "created_at": time.time()}
+        ])
+        with patch.object(category_layer, "get_category_content") as read:
+            await category_layer.evolve()
+        read.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_persist_meta(self, category_layer):
@@ -363,10 +669,69 @@ class TestCategoryLayer:
         await category_layer.organize([
             {"content": "persist meta test", "category": "knowledge", "significance": 0.5, "created_at": time.time()}
         ])
+        await category_layer.flush()
         meta = json.loads(category_layer._meta_path.read_text())
         assert "knowledge" in meta
         assert meta["knowledge"]["item_count"] >= 1
 
+    @pytest.mark.asyncio
+    async def test_load_tolerates_legacy_meta(self, category_layer):
+        category_layer._meta_path.write_text(json.dumps({
+            "old_cat": {"item_count": 3, "unknown_field": True},
+        }))
+        await category_layer.load()
+        cats = {c["id"]: c for c in category_layer.list_all()}
+        assert cats["old_cat"]["name"] == "old_cat"
+        assert cats["old_cat"]["item_count"] == 3
+        assert list(cats)[0] == "old_cat"
+
+    @pytest.mark.asyncio
+    async def test_list_all_limit_returns_largest(self, category_layer):
+        await category_layer.load()
+        await category_layer.organize([
+            {"content": f"tech {i}", "category": "technical", "created_at": time.time()} for i in range(3)
+        ] + [
+            {"content": "one project", "category": "projects", "created_at": time.time()}
+        ])
+        top = category_layer.list_all(limit=2)
+        assert [c["id"] for c in top] == ["technical", "projects"]
+        assert len(category_layer.list_all()) == category_layer.count
+
+    @pytest.mark.asyncio
+    async def test_persist_meta_coalesces_bursts(self, category_layer):
+        await category_layer.load()
+        with patch.object(category_layer, "_write_meta", wraps=category_layer._write_meta) as write:
+            for i in range(5):
+                await category_layer.organize([
+                    {"content": f"burst {i}", "category": "knowledge", "created_at": time.time()}
+                ])
+            await category_layer.flush()
+        assert write.call_count == 1
+        meta = json.loads(category_layer._meta_path.read_text())
+        assert meta["knowledge"]["item_count"] == 5
+
+
+    @pytest.mark.asyncio
+    async def test_index_connection_opened_once_across_threads(self, category_layer):
+        import sqlite3
+        connect = sqlite3.connect
+        opened = []
+
+        def slow_connect(*args, **kwargs):
+            time.sleep(0.05)  # widen the race window
+            db = connect(*args, **kwargs)
+            opened.append(db)
+            return db
+
+        with patch("openclaw.memory.category_layer.sqlite3.connect", side_effect=slow_connect):
+            threads = [threading.Thread(target=category_layer._get_db) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        assert len(opened) == 1
+        assert category_layer._get_db() is opened[0]
+        await category_layer.close()
 
 # ══════════════════════════════════════════════════════════════
 #  HYBRID RETRIEVAL
@@ -427,6 +792,35 @@ class TestHybridRetrieval:
         ids = [r.get("id") for r in results if r.get("id")]
         assert len(ids) == len(set(ids)), "Duplicate items found in hybrid results"
 
+    @pytest.mark.asyncio
+    async def test_hybrid_keeps_category_hits_with_shared_prefix(self, retrieval, category_layer):
+        prefix = "x" * 100
+        hits = [
+            {"category": "a", "content": prefix + " first", "source": "category"},
+            {"category": "b", "content": prefix + " second", "source": "category"},
+        ]
+        with patch.object(category_layer, "search_categories_async", AsyncMock(return_value=hits)):
+            results = await retrieval.search("anything", top_k=10, method="hybrid")
+        assert [r["category"] for r in results] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_hybrid_runs_semantic_and_category_concurrently(self, retrieval, category_layer):
+        category_started = asyncio.Event()
+
+        async def semantic(query, top_k):
+            # Only completes if the category search is already in flight
+            await asyncio.wait_for(category_started.wait(), timeout=1)
+            return []
+
+        async def categories(query, limit):
+            category_started.set()
+            return [{"category": "a", "content": "hit", "source": "category"}]
+
+        with patch.object(retrieval, "_semantic_search", semantic), \
+                patch.object(category_layer, "search_categories_async", categories):
+            results = await retrieval.search("anything", top_k=5, method="hybrid")
+        assert [r["category"] for r in results] == ["a"]
+
     @pytest.mark.asyncio
     async def test_tokenizer_strips_stop_words(self, retrieval):
         tokens = retrieval._tokenize("the quick brown fox is jumping over the lazy dog")
@@ -443,6 +837,11 @@ class TestHybridRetrieval:
         assert "chat" in tokens
         assert "table" in tokens
 
+    @pytest.mark.asyncio
+    async def test_tokenizer_splits_on_punctuation(self, retrieval):
+        tokens = retrieval._tokenize("Déjà-vu: snake_case, x+y=z! Été")
+        assert tokens == ["déjà", "vu", "snake_case", "été"]
+
     @pytest.mark.asyncio
     async def test_keyword_tfidf_scoring(self, retrieval, item_layer, category_layer):
         """Items with rare terms should score higher than common ones (IDF effect)."""
@@ -457,6 +856,200 @@ class TestHybridRetrieval:
         # The item mentioning "asyncio" should score highest (rare term boost)
         assert "asyncio" in results[0]["content"]
 
+    @pytest.mark.asyncio
+    async def test_recency_computed_once_per_refresh(self, retrieval, item_layer):
+        now = time.time()
+        await item_layer.store({"content": "old", "created_at": now - 720 * 3600})
+        with patch("openclaw.memory.retrieval.math.exp", wraps=math.exp) as exp:
+            retrieval._contextual_search("", 5)
+            await item_layer.store({"content": "new"})
+            recency = retrieval._recency_scores(item_layer.all_items())
+            assert exp.call_count == 2  # one per item, not per query
+
+        assert recency[0] == pytest.approx(math.exp(-1), rel=1e-3)
+        assert recency[1] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_keyword_rebuild_retokenizes_only_edited_items(self, retrieval, item_layer):
+        ids = [await item_layer.store({"content": f"note number {i}"}) for i in range(5)]
+        calls = []
+
+        def tokenize(text):
+            calls.append(text)
+            return retrieval._tokenize(text)
+
+        item_layer.keyword_index(tokenize)
+        assert len(calls) == 5
+
+        await item_layer.update(ids[2], {"content": "edited note"})
+        item_layer.keyword_index(tokenize)
+        assert calls[5:] == ["edited note"]
+
+    @pytest.mark.asyncio
+    async def test_keyword_index_tracks_new_and_edited_items(self, retrieval, item_layer):
+        first = await item_layer.store({"content": "kubernetes cluster setup"})
+        assert [r["id"] for r in retrieval._keyword_search("kubernetes", 5)] == [first]
+
+        # Stored after the index was built: picked up incrementally
+        second = await item_layer.store({"content": "kubernetes helm charts"})
+        assert {r["id"] for r in retrieval._keyword_search("kubernetes", 5)} == {first, second}
+
+        await item_layer.update(first, {"content": "nomad cluster setup"})
+        assert [r["id"] for r in retrieval._keyword_search("kubernetes", 5)] == [second]
+
+
+# ══════════════════════════════════════════════════════════════
+#  VECTOR STORE — ChromaDB collection mocked
+# ══════════════════════════════════════════════════════════════
+
+
+@pytest.fixture
+def vector_store(tmp_path, fake_settings):
+    with patch("openclaw.memory.vector_store.get_settings", return_value=fake_settings):
+        store = VectorStore(persist_dir=str(tmp_path / "chroma"))
+    store._collection = MagicMock()
+    store._embedding_fn = FallbackEmbedder()
+    store._initialized = True
+    return store
+
+
+class TestVectorStore:
+
+    @pytest.mark.asyncio
+    async def test_add_batch_embeds_in_one_call(self, vector_store):
+        docs = [{"content": f"document number {i}"} for i in range(5)]
+        with patch.object(vector_store._embedding_fn, "embed_many",
+                          wraps=vector_store._embedding_fn.embed_many) as embed_many:
+            ids = await vector_store.add_batch(docs)
+        embed_many.assert_called_once_with([d["content"] for d in docs])
+        upsert = vector_store._collection.upsert
+        upsert.assert_called_once()
+        assert upsert.call_args.kwargs["ids"] == ids
+        assert upsert.call_args.kwargs["embeddings"] == [
+            vector_store._embedding_fn.embed(d["content"]) for d in docs
+        ]
+
+    @pytest.mark.asyncio
+    async def test_add_batch_chunks_upserts(self, vector_store):
+        docs = [{"id": f"d{i}", "content": f"doc {i}"} for i in range(5)]
+        with patch("openclaw.memory.vector_store.UPSERT_BATCH_SIZE", 2):
+            await vector_store.add_batch(docs)
+        calls = vector_store._collection.upsert.call_args_list
+        assert [c.kwargs["ids"] for c in calls] == [["d0", "d1"], ["d2", "d3"], ["d4"]]
+
+    @pytest.mark.asyncio
+    async def test_search_queries_off_event_loop(self, vector_store):
+        loop_thread = threading.get_ident()
+        query_threads = []
+
+        def query(**kwargs):
+            query_threads.append(threading.get_ident())
+            return {"ids": [["d0"]], "documents": [["doc"]],
+                    "metadatas": [[{}]], "distances": [[0.25]]}
+
+        vector_store._collection.query.side_effect = query
+        results = await vector_store.search("doc", top_k=1)
+        assert results == [{"id": "d0", "content": "doc", "metadata": {}, "score": 0.75}]
+        assert query_threads and query_threads[0] != loop_thread
+
+    def test_generated_ids_are_content_addressed(self, vector_store):
+        doc_id = vector_store._generate_id("same content")
+        assert len(doc_id) == 16
+        int(doc_id, 16)
+        assert vector_store._generate_id("same content") == doc_id
+        assert vector_store._generate_id("other content") != doc_id
+
+    def test_fallback_embedding_normalized_and_count_weighted(self):
+        embedder = FallbackEmbedder(dimensions=64)
+        once = embedder.embed("alpha beta")
+        assert math.isclose(sum(x * x for x in once), 1.0)
+        # Repeats and case only change magnitude, never direction
+        assert embedder.embed("Alpha beta ALPHA BETA") == pytest.approx(once)
+        assert embedder.embed("") == [0.0] * 64
+
+    @pytest.mark.asyncio
+    async def test_search_reads_only_included_fields(self, vector_store):
+        vector_store._collection.query.return_value = {
+            "ids": [["d0"]], "documents": None, "metadatas": None, "distances": [[0.5]],
+        }
+        results = await vector_store.search("doc", top_k=1, include=("distances",))
+        assert vector_store._collection.query.call_args.kwargs["include"] == ["distances"]
+        assert results == [{"id": "d0", "score": 0.5}]
+
+    @pytest.mark.asyncio
+    async def test_get_fetches_by_id(self, vector_store):
+        vector_store._collection.get.return_value = {
+            "ids": ["d1"], "documents": ["body"], "metadatas": [None],
+        }
+        assert await vector_store.get(["d1", "gone"]) == [{"id": "d1", "content": "body", "metadata": {}}]
+        assert await vector_store.get([]) == []
+        vector_store._collection.get.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_add_batch_empty(self, vector_store):
+        assert await vector_store.add_batch([]) == []
+        vector_store._collection.upsert.assert_not_called()
+
+
+# ══════════════════════════════════════════════════════════════
+#  FAISS VECTOR STORE — skipped unless faiss-cpu is installed
+# ══════════════════════════════════════════════════════════════
+
+
+@pytest.fixture
+def faiss_store(tmp_path, fake_settings):
+    pytest.importorskip("faiss")
+    with patch("openclaw.memory.vector_store.get_settings", return_value=fake_settings):
+        store = FaissVectorStore(persist_dir=str(tmp_path / "faiss"))
+    store._setup_embedding_function = lambda: setattr(store, "_embedding_fn", FallbackEmbedder())
+    return store
+
+
+class TestFaissVectorStore:
+
+    @pytest.mark.asyncio
+    async def test_item_layer_selects_faiss_backend(self, item_layer):
+        item_layer.settings._overrides.update({
+            "memory.vector.enabled": True, "memory.vector.backend": "faiss",
+        })
+        with patch.object(FaissVectorStore, "initialize", AsyncMock()):
+            store = await item_layer._get_vector_store()
+        assert isinstance(store, FaissVectorStore)
+
+    @pytest.mark.asyncio
+    async def test_search_ranks_and_replaces(self, faiss_store):
+        await faiss_store.add_batch([
+            {"id": "a", "content": "python asyncio event loop", "metadata": {"kind": "x"}},
+            {"id": "b", "content": "rust ownership borrow checker", "metadata": {"kind": "y"}},
+        ])
+        results = await faiss_store.search("python asyncio", top_k=1)
+        assert results[0]["id"] == "a"
+        assert results[0]["metadata"] == {"kind": "x"}
+
+        # Re-adding an id replaces its vector instead of duplicating it
+        await faiss_store.add("rust ownership borrow checker", doc_id="a")
+        assert await faiss_store.count() == 2
+        assert {r["id"] for r in await faiss_store.search("rust ownership", top_k=2)} == {"a", "b"}
+        assert [r["id"] for r in await faiss_store.search("rust", top_k=2, where={"kind": "y"})] == ["b"]
+        await faiss_store.flush()
+
+    @pytest.mark.asyncio
+    async def test_persists_and_deletes(self, faiss_store, fake_settings):
+        await faiss_store.add("first document", doc_id="one")
+        await faiss_store.add("second document", doc_id="two")
+        assert await faiss_store.delete("one") is True
+        assert await faiss_store.delete("missing") is False
+        await faiss_store.flush()
+
+        with patch("openclaw.memory.vector_store.get_settings", return_value=fake_settings):
+            reloaded = FaissVectorStore(persist_dir=str(faiss_store._persist_dir))
+        reloaded._setup_embedding_function = lambda: setattr(reloaded, "_embedding_fn", FallbackEmbedder())
+        assert await reloaded.count() == 1
+        assert await reloaded.get(["one", "two"]) == [
+            {"id": "two", "content": "second document", "metadata": {}}
+        ]
+        assert [r["id"] for r in await reloaded.search("second", top_k=5)] == ["two"]
+
 
 # ══════════════════════════════════════════════════════════════
 #  MEMORY MANAGER — full integration
@@ -620,6 +1213,147 @@ class TestExtraction:
         result = memory_manager._analyze_content(msg, "user_statement")
         assert len(result) <= 20
 
+    def test_significance_tiers(self, memory_manager):
+        msg = (
+            "Remember that the deploy runs nightly. "
+            "Could you explain the release process. "
+            "The weather outside was cloudy today"
+        )
+        result = dict(memory_manager._analyze_content(msg, "user_statement"))
+        assert result == {
+            "Remember that the deploy runs nightly": 0.8,
+            "Could you explain the release process": 0.5,
+        }
+
+
+# ══════════════════════════════════════════════════════════════
+#  EVOLUTION
+# ══════════════════════════════════════════════════════════════
+
+
+class TestMemoryEvolver:
+
+    def test_suggest_category_counts_overlapping_keywords(self, evolver):
+        # "plans" holds both "plan" (projects) and "ans" (user_profile);
+        # the tie goes to the category listed first
+        assert evolver._suggest_category("Our plans") == "user_profile"
+        assert evolver._suggest_category("Python code on the server") == "technical"
+        assert evolver._suggest_category("nothing relevant here") == "general"
+
+    def test_category_keywords_are_not_prefixes(self):
+        kws = [kw for kws in CATEGORY_KEYWORDS.values() for kw in kws]
+        assert not [(a, b) for a in kws for b in kws if a != b and b.startswith(a)]
+
+    @pytest.mark.asyncio
+    async def test_link_requires_three_shared_long_words(self, evolver, item_layer):
+        a = await item_layer.store({"content": "python asyncio eventloop tutorial"})
+        b = await item_layer.store({"content": "an asyncio eventloop python example"})
+        c = await item_layer.store({"content": "python asyncio only"})
+
+        await evolver._link()
+
+        items = {i["id"]: i for i in item_layer.all_items()}
+        assert items[a]["links"] == [b]
+        assert "links" not in items[b]
+        assert "links" not in items[c]
+
+    @pytest.mark.asyncio
+    async def test_link_caps_at_ten(self, evolver, item_layer):
+        for i in range(15):
+            await item_layer.store({"content": f"shared alpha bravo charlie item{i:02d}"})
+
+        await evolver._link()
+
+        first = item_layer.all_items()[0]
+        assert len(first["links"]) == 10
+        assert first["links"] == [i["id"] for i in item_layer.all_items()[1:11]]
+
+    @pytest.mark.asyncio
+    async def test_link_incremental_matches_new_items(self, evolver, item_layer):
+        a = await item_layer.store({"content": "python asyncio eventloop tutorial"})
+        await evolver._link()
+        b = await item_layer.store({"content": "asyncio eventloop python example"})
+        await evolver._link()
+        assert item_layer._peek(a)["links"] == [b]
+
+        # Editing an indexed item rebuilds the index from scratch
+        c = await item_layer.store({"content": "unrelated"})
+        await evolver._link()
+        await item_layer.update(c, {"content": "python asyncio eventloop again"})
+        await evolver._link()
+        assert item_layer._peek(a)["links"] == [b, c]
+        assert item_layer._peek(b)["links"] == [c]
+
+    @pytest.mark.asyncio
+    async def test_run_cycle_skips_unchanged_items(self, evolver, item_layer):
+        await item_layer.store({"content": "alpha bravo charlie delta"})
+        with patch.object(evolver, "_link", AsyncMock()) as link:
+            await evolver.run_cycle()
+            await evolver.run_cycle()
+            assert link.await_count == 1
+
+            await item_layer.store({"content": "alpha bravo charlie echo"})
+            await evolver.run_cycle()
+            assert link.await_count == 2
+
+    def test_common_themes_skip_stopwords(self, evolver):
+        items = [
+            {"id": "a", "content": "there would be docker images"},
+            {"id": "b", "content": "there would be docker volumes"},
+        ]
+        assert evolver._find_common_themes(items) == ["docker"]
+
+
+# ══════════════════════════════════════════════════════════════
+#  EPISODIC MEMORY
+# ══════════════════════════════════════════════════════════════
+
+
+class TestEpisodicMemory:
+
+    def test_narrative_context_reads_only_recent_chapters(self, episodic):
+        for i in range(6):
+            episodic._append_to_memory(f"summary {i} " + "x" * 200)
+
+        with patch("openclaw.memory.evolution._TAIL_CHUNK_BYTES", 64):
+            context = episodic.get_narrative_context(max_chapters=2)
+
+        assert context.count("## Chapitre - ") == 2
+        assert "summary 4" in context and "summary 5" in context
+        assert "summary 3" not in context
+
+    def test_narrative_context_empty_without_chapters(self, episodic):
+        assert episodic.get_narrative_context() == ""
+
+    @pytest.mark.asyncio
+    async def test_consolidate_caps_session_content(self, episodic):
+        episodic.brain = MagicMock()
+        episodic.brain.generate = AsyncMock(return_value={"content": "chapter"})
+        exchanges = [{"role": "user", "content": f"message {i} " + "y" * 600} for i in range(100)]
+
+        assert await episodic.consolidate(exchanges) == "chapter"
+
+        prompt = episodic.brain.generate.await_args.kwargs["messages"][0]["content"]
+        full = "\n".join(f"[USER]: {e['content'][:500]}..." for e in exchanges)
+        assert full[:8000] + "\n... (tronque)" in prompt
+        assert "message 99" not in prompt
+
+    def test_last_timestamp_from_sidecar(self, episodic):
+        episodic._append_to_memory("a chapter")
+        stamp = float(Path(episodic._timestamp_file).read_text())
+
+        # The markdown is not consulted while the sidecar exists
+        Path(episodic._memory_file).write_text("no markers here", encoding="utf-8")
+        assert episodic._read_last_timestamp() == stamp
+
+    def test_last_timestamp_migrates_from_markers(self, episodic):
+        Path(episodic._memory_file).write_text(
+            "# PROJECT MEMORY\n<!-- consolidated: 100.5 -->\n<!-- consolidated: 200.25 -->\n",
+            encoding="utf-8",
+        )
+        assert episodic._read_last_timestamp() == 200.25
+        assert Path(episodic._timestamp_file).read_text() == "200.25"
+
 
 # ══════════════════════════════════════════════════════════════
 #  FORGETTING MECHANISM
@@ -645,6 +1379,7 @@ class TestForgetting:
 
         item = memory_manager.items.all_items()[0]
         assert item["significance"] < 0.7, f"Expected decay, got {item['significance']}"
+        assert item["id"] in memory_manager.items._pending
 
     @pytest.mark.asyncio
     async def test_forgetting_spares_accessed_items(self, memory_manager):
@@ -726,6 +1461,18 @@ class TestForgetting:
         # so age < grace_seconds (0), meaning it will be subject to forgetting if access_count < 2
         # Actually grace_period_days = 0 → grace_seconds = 0, so ALL items past the 0 second grace will be checked
 
+    @pytest.mark.asyncio
+    async def test_forgetting_yields_between_batches(self, memory_manager):
+        await memory_manager.initialize()
+        for i in range(5):
+            await memory_manager.items.store({"content": f"item {i}", "access_count": 0})
+
+        with patch("openclaw.memory.manager.FORGETTING_BATCH_SIZE", 2), \
+             patch("openclaw.memory.manager.asyncio.sleep", AsyncMock()) as sleep:
+            await memory_manager._apply_forgetting()
+        assert sleep.await_count == 2
+        assert all(i["significance"] < 0.5 for i in memory_manager.items.all_items())
+
 
 # ══════════════════════════════════════════════════════════════
 #  EDGE CASES
@@ -2,18 +2,26 @@
 Tests for SandboxExecutor — command classification, path validation,
 self-healing loop, and sandbox routing.
 Covers: safe/dangerous classification, pipe patterns, command substitution,
-        sensitive paths, self-healing with mock brain, _strip_code_fences.
+        sensitive paths, self-healing with mock brain, _strip_code_fences,
+        ContainerManager with a mocked Docker client.
 """
 
+import asyncio
+import tarfile
+import threading
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from openclaw.sandbox.container import ContainerManager
 from openclaw.sandbox.executor import (
     SandboxExecutor,
     DANGEROUS_PATTERNS,
     SAFE_COMMANDS,
     HEALABLE_ERROR_PATTERNS,
+    TRACE_PREVIEW_CHARS,
+    _classify_command,
 )
 
 
@@ -88,6 +96,15 @@ class TestSafeCommands:
     def test_docker_ps(self, executor):
         assert not executor._is_dangerous_command("docker ps -a")
 
+    def test_git_subcommand_must_be_listed(self, executor):
+        assert not executor._is_dangerous_command("git log --oneline")
+        assert executor._is_dangerous_command("git clone x; eval $(cat y)")
+
+    def test_safe_word_must_stand_alone(self, executor):
+        """A safe command glued to another one is not trusted as a prefix."""
+        assert executor._is_dangerous_command("ls;rm -rf /")
+        assert executor._is_dangerous_command("echo$(rm -rf /)")
+
 
 # ══════════════════════════════════════════════════════════════
 #  Command classification: DANGEROUS commands
@@ -132,6 +149,31 @@ class TestDangerousCommands:
     def test_perl_inline(self, executor):
         assert executor._is_dangerous_command("perl -e 'system(\"rm -rf /\")'")
 
+    def test_patterns_span_line_continuations(self, executor):
+        assert executor._is_dangerous_command("rm -rf build \\\n  *")
+        assert executor._is_dangerous_command("python3 \\\n  -c 'print(1)'")
+
+    def test_long_commands_scan_in_linear_time(self, executor):
+        """Repeated prefixes with no terminator used to cost O(n^2)."""
+        for command in ("python " * 30000, "rm x " * 40000, "$(a" * 70000):
+            start = time.perf_counter()
+            executor._is_dangerous_command(command)
+            assert time.perf_counter() - start < 1.5
+
+    def test_logs_the_pattern_that_fired(self, executor, caplog):
+        with caplog.at_level("WARNING", logger="openclaw.sandbox.executor"):
+            assert executor._is_dangerous_command("mkfs.ext4 /dev/sda1")
+        assert "Dangerous pattern detected: mkfs" in caplog.text
+
+    def test_repeated_commands_hit_cache_and_still_warn(self, executor, caplog):
+        command = "mkfs.ext4 /dev/sdz9 # cache test"
+        executor._is_dangerous_command(command)
+        hits = _classify_command.cache_info().hits
+        with caplog.at_level("WARNING", logger="openclaw.sandbox.executor"):
+            assert executor._is_dangerous_command(command)
+        assert _classify_command.cache_info().hits == hits + 1
+        assert "Dangerous pattern detected: mkfs" in caplog.text
+
 
 # ══════════════════════════════════════════════════════════════
 #  Pipes, base64, command substitution
@@ -147,6 +189,10 @@ class TestComplexPatterns:
     def test_pipe_to_sh(self, executor):
         assert executor._is_dangerous_command("nc -l 1234 | sh")
 
+    def test_network_tool_after_chain(self, executor):
+        assert executor._is_dangerous_command("cd /tmp && WGET http://x/y")
+        assert not executor._is_dangerous_command("wget http://x/file.tar.gz")
+
     def test_pipe_to_zsh(self, executor):
         assert executor._is_dangerous_command("nc -l 1234 | zsh")
 
@@ -269,7 +315,7 @@ class TestSelfHealing:
         })
 
         # Mock _execute_sandboxed: corrected code succeeds on first try
-        async def mock_sandboxed(tool_name, args, session_id=None):
+        async def mock_sandboxed(tool_name, args, session_id=None, container_id=None):
             return {"success": True, "output": "fixed", "sandboxed": True}
 
         executor._execute_sandboxed = mock_sandboxed
@@ -290,7 +336,7 @@ class TestSelfHealing:
             "content": "still_broken()", "model": "mock", "usage": {}, "tool_calls": [],
         })
 
-        async def always_fail(tool_name, args, session_id=None):
+        async def always_fail(tool_name, args, session_id=None, container_id=None):
             return {"success": False, "error": "SyntaxError: invalid syntax"}
 
         executor._execute_sandboxed = always_fail
@@ -331,7 +377,7 @@ class TestSelfHealing:
             "model": "mock", "usage": {}, "tool_calls": [],
         })
 
-        async def check_args(tool_name, args, session_id=None):
+        async def check_args(tool_name, args, session_id=None, container_id=None):
             code = args.get("code", "")
             assert "```" not in code  # fences should be stripped
             return {"success": True, "output": "hi", "sandboxed": True}
@@ -345,6 +391,95 @@ class TestSelfHealing:
         )
         assert result["success"] is True
 
+    @pytest.mark.asyncio
+    async def test_self_healing_updates_content_key(self, executor, brain):
+        """Each retry carries its own fix; the caller's args are untouched."""
+        brain.generate = AsyncMock(side_effect=[
+            {"content": f"fix_{i}()", "model": "mock", "usage": {}, "tool_calls": []}
+            for i in range(3)
+        ])
+        seen = []
+
+        async def record(tool_name, args, session_id=None, container_id=None):
+            seen.append(dict(args))
+            return {"success": False, "error": "NameError: fix"}
+
+        executor._execute_sandboxed = record
+        executor._get_sandbox_context = AsyncMock(return_value="Python: 3.11")
+
+        original = {"content": "bad()", "timeout": 5}
+        await executor._self_healing_loop(
+            "python", original, "sess1", {"success": False, "error": "NameError"}
+        )
+        assert seen == [{"content": f"fix_{i}()", "timeout": 5} for i in range(3)]
+        assert original == {"content": "bad()", "timeout": 5}
+
+    @pytest.mark.asyncio
+    async def test_self_healing_trace_previews_output(self, executor, brain):
+        """Only a bounded preview of a large output is kept in the trace."""
+        async def big_output(tool_name, args, session_id=None, container_id=None):
+            return {"success": True, "output": "x" * 10_000, "sandboxed": True}
+
+        executor._execute_sandboxed = big_output
+        executor._get_sandbox_context = AsyncMock(return_value="Python: 3.11")
+
+        result = await executor._self_healing_loop(
+            "python", {"code": "bad("}, "sess1", {"success": False, "error": "SyntaxError"}
+        )
+        assert len(result["output"]) == 10_000
+        assert result["healing_trace"][-1]["output"] == "x" * TRACE_PREVIEW_CHARS + "…"
+
+    @pytest.mark.asyncio
+    async def test_self_healing_pins_container(self, executor, brain):
+        """The container is looked up once and reused by every retry."""
+        brain.generate = AsyncMock(side_effect=[
+            {"content": f"fix_{i}()", "model": "mock", "usage": {}, "tool_calls": []}
+            for i in range(3)
+        ])
+        executor.container_manager.get_sandbox_for_session = AsyncMock(return_value="c1")
+        executor.container_manager.execute_in_sandbox = AsyncMock(
+            return_value={"success": True, "stdout": "Python: 3.11"}
+        )
+        executor.container_manager.execute_python = AsyncMock(return_value={
+            "success": False, "exit_code": 1, "stdout": "", "stderr": "NameError: fix",
+        })
+
+        await executor._self_healing_loop(
+            "python", {"code": "bad()"}, None, {"success": False, "error": "NameError"}
+        )
+        executor.container_manager.get_sandbox_for_session.assert_awaited_once_with("default")
+        containers = [c.args[0] for c in executor.container_manager.execute_python.await_args_list]
+        assert containers == ["c1"] * 3
+
+    @pytest.mark.asyncio
+    async def test_self_healing_fanout_tries_each_candidate(self, executor, brain):
+        """Fixes are requested together; the first one that runs wins."""
+        brain.generate = AsyncMock(side_effect=[
+            {"content": "wrong()", "model": "mock", "usage": {}, "tool_calls": []},
+            RuntimeError("rate limited"),
+            {"content": "right()", "model": "mock", "usage": {}, "tool_calls": []},
+        ])
+        ran = []
+
+        async def run(tool_name, args, session_id=None, container_id=None):
+            ran.append(args["code"])
+            if args["code"] == "right()":
+                return {"success": True, "output": "ok", "sandboxed": True}
+            return {"success": False, "error": "NameError: wrong"}
+
+        executor._heal_fanout = 3
+        executor._execute_sandboxed = run
+        executor._get_sandbox_context = AsyncMock(return_value="Python: 3.11")
+
+        result = await executor._self_healing_loop(
+            "python", {"code": "bad()"}, "sess1", {"success": False, "error": "NameError"}
+        )
+        assert result["success"] is True
+        assert result["healing_attempts"] == 1
+        assert ran == ["wrong()", "right()"]
+        temperatures = [c.kwargs["temperature"] for c in brain.generate.await_args_list]
+        assert temperatures == pytest.approx([0.2, 0.4, 0.6])
+
     @pytest.mark.asyncio
     async def test_self_healing_llm_error_stops(self, executor, brain):
         """If the LLM call itself fails, stop healing."""
@@ -395,6 +530,15 @@ class TestHealableErrors:
     def test_indentation_error(self, executor):
         assert executor._is_healable_error("IndentationError: unexpected indent")
 
+    def test_error_named_anywhere_in_traceback(self, executor):
+        error = (
+            "Traceback (most recent call last):\n"
+            "KeyError: 'x'\n\n"
+            "During handling of the above exception, another exception occurred:\n\n"
+            "RuntimeError: wrapped"
+        )
+        assert executor._is_healable_error(error)
+
     def test_non_healable(self, executor):
         assert not executor._is_healable_error("Connection refused")
 
@@ -434,6 +578,49 @@ class TestExecuteRouting:
         assert result["success"] is False
         assert "No base executor" in result["error"]
 
+    @pytest.mark.asyncio
+    async def test_sandboxed_write_uses_put_file(self, executor):
+        manager = executor.container_manager
+        manager.get_sandbox_for_session = AsyncMock(return_value="c1")
+        manager.put_file = AsyncMock(return_value=True)
+        manager.execute_in_sandbox = AsyncMock()
+
+        result = await executor._execute_sandboxed(
+            "write_file", {"path": "/etc/motd", "content": "héllo"}, "s1"
+        )
+        assert result == {
+            "success": True, "path": "/workspace/etc/motd", "error": None, "sandboxed": True,
+        }
+        manager.put_file.assert_awaited_once_with(
+            "c1", "/workspace/etc/motd", "héllo".encode("utf-8")
+        )
+        manager.execute_in_sandbox.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_sandboxed_write_rejects_workspace_escape(self, executor):
+        manager = executor.container_manager
+        manager.get_sandbox_for_session = AsyncMock(return_value="c1")
+        manager.put_file = AsyncMock(return_value=True)
+
+        result = await executor._execute_sandboxed(
+            "write_file", {"path": "../etc/profile", "content": "x"}, "s1"
+        )
+        assert result["success"] is False
+        assert "escapes the sandbox workspace" in result["error"]
+        manager.put_file.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_sandboxed_write_reports_failure(self, executor):
+        manager = executor.container_manager
+        manager.get_sandbox_for_session = AsyncMock(return_value="c1")
+        manager.put_file = AsyncMock(return_value=False)
+
+        result = await executor._execute_sandboxed(
+            "write", {"path": "notes.txt", "content": "x"}, "s1"
+        )
+        assert result["success"] is False
+        assert result["error"] == "Failed to write /workspace/notes.txt"
+
 
 # ══════════════════════════════════════════════════════════════
 #  _strip_code_fences
@@ -453,3 +640,176 @@ class TestStripCodeFences:
 
     def test_no_fences(self):
         assert SandboxExecutor._strip_code_fences("x=1") == "x=1"
+
+    def test_unclosed_fence(self):
+        assert SandboxExecutor._strip_code_fences("  ```python\nx=1\n") == "x=1"
+
+    def test_backticks_inside_code_kept(self):
+        code = "```python\ns = '``'\n```"
+        assert SandboxExecutor._strip_code_fences(code) == "s = '``'"
+
+
+# ══════════════════════════════════════════════════════════════
+#  ContainerManager (Docker client mocked)
+# ══════════════════════════════════════════════════════════════
+
+
+@pytest.fixture
+def containers(tmp_path):
+    with patch("openclaw.sandbox.container.get_settings") as mock_gs:
+        overrides = {"sandbox.workspace": str(tmp_path), "sandbox.warm_pool_size": 0}
+        mock_gs.return_value.get = lambda k, d=None: overrides.get(k, d)
+        manager = ContainerManager()
+    manager._docker_client = MagicMock()
+    manager._initialized = True
+    return manager
+
+
+def _archive_members(put_archive) -> dict[str, bytes]:
+    """Unpack the tar stream passed to a mocked put_archive."""
+    _, stream = put_archive.call_args.args
+    with tarfile.open(fileobj=stream, mode="r") as tar:
+        return {m.name: tar.extractfile(m).read() for m in tar.getmembers()}
+
+
+class TestContainerManager:
+
+    @pytest.mark.asyncio
+    async def test_copy_to_sandbox_streams_file(self, containers, tmp_path):
+        local = tmp_path / "data.bin"
+        local.write_bytes(b"x" * 100_000)
+        container = containers._docker_client.containers.get.return_value
+        members = {}
+        container.put_archive.side_effect = lambda path, stream: members.update(
+            _archive_members(container.put_archive)
+        )
+
+        with patch("openclaw.sandbox.container.ARCHIVE_SPOOL_BYTES", 1024), \
+                patch("pathlib.Path.read_bytes", side_effect=AssertionError):
+            await containers.copy_to_sandbox("cid", str(local), "/workspace/in.bin")
+
+        assert container.put_archive.call_args.args[0] == "/workspace"
+        assert members == {"in.bin": b"x" * 100_000}
+
+    @pytest.mark.asyncio
+    async def test_put_file_writes_under_workspace_as_sandbox_user(self, containers):
+        container = containers._docker_client.containers.get.return_value
+        members = {}
+
+        def put_archive(path, stream):
+            with tarfile.open(fileobj=stream, mode="r") as tar:
+                for m in tar.getmembers():
+                    f = tar.extractfile(m)
+                    members[m.name] = (m.isdir(), f.read() if f else None, m.uid, m.gid)
+            return True
+
+        container.put_archive.side_effect = put_archive
+        assert await containers.put_file("cid", "/workspace/a/b/../c.txt", b"it's $(x)")
+
+        assert container.put_archive.call_args.args[0] == "/workspace"
+        assert members == {
+            "a": (True, None, 65534, 65534),
+            "a/c.txt": (False, b"it's $(x)", 65534, 65534),
+        }
+        container.exec_run.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_put_file_refuses_paths_outside_workspace(self, containers):
+        for path in ("/workspace/../etc/profile", "/etc/profile", "/workspace"):
+            with pytest.raises(ValueError):
+                await containers.put_file("cid", path, b"x")
+        containers._docker_client.containers.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_docker_calls_run_off_event_loop(self, containers):
+        loop_thread = threading.get_ident()
+        exec_threads = []
+        container = containers._docker_client.containers.get.return_value
+
+        def exec_run(**kwargs):
+            exec_threads.append(threading.get_ident())
+            return MagicMock(exit_code=0, output=(b"hi\n", None))
+
+        container.exec_run.side_effect = exec_run
+        result = await containers.execute_in_sandbox("cid", "echo hi")
+        assert result == {"success": True, "exit_code": 0, "stdout": "hi\n", "stderr": ""}
+        assert exec_threads and exec_threads[0] != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_execute_python_writes_script_with_put_archive(self, containers):
+        code = "print('it''s', \"quoted\", 'é')\n"
+        container = containers._docker_client.containers.get.return_value
+        members = {}
+        container.put_archive.side_effect = lambda path, stream: members.update(
+            _archive_members(container.put_archive)
+        )
+        container.exec_run.return_value = MagicMock(exit_code=0, output=(b"ok\n", None))
+
+        result = await containers.execute_python("cid", code)
+
+        assert result["stdout"] == "ok\n"
+        assert container.put_archive.call_args.args[0] == "/workspace"
+        assert members == {"_script.py": code.encode("utf-8")}
+        container.exec_run.assert_called_once()
+        assert container.exec_run.call_args.kwargs["cmd"][-1] == "python3 /workspace/_script.py"
+
+    @pytest.mark.asyncio
+    async def test_destroy_sandbox_forgets_session(self, containers):
+        create = containers._docker_client.containers.create
+        create.side_effect = [MagicMock(id="c1"), MagicMock(id="c2")]
+        assert await containers.create_sandbox("s1") == "c1"
+        assert await containers.create_sandbox("s2") == "c2"
+
+        await containers.destroy_sandbox("c1")
+        assert containers._active_containers == {"s2": "c2"}
+        assert containers._container_sessions == {"c2": "s2"}
+        assert containers.active_count == 1
+
+    @pytest.mark.asyncio
+    async def test_new_sessions_take_warm_containers(self, containers, tmp_path):
+        overrides = {"sandbox.workspace": str(tmp_path), "sandbox.warm_pool_size": 1}
+        containers.settings.get = lambda k, d=None: overrides.get(k, d)
+        docker = containers._docker_client.containers
+        docker.create.side_effect = [MagicMock(id=f"c{i}") for i in range(3)]
+        docker.get.return_value.status = "running"
+
+        # Cold start for the first session, then a warm one is started
+        assert await containers.create_sandbox("s1") == "c0"
+        await containers._warm_task
+        assert containers._warm == ["c1"]
+
+        # The next session gets the warm container and the pool refills
+        assert await containers.create_sandbox("s2") == "c1"
+        await containers._warm_task
+        assert containers._warm == ["c2"]
+        assert containers._active_containers == {"s1": "c0", "s2": "c1"}
+
+    @pytest.mark.asyncio
+    async def test_cleanup_removes_warm_container_started_late(self, containers):
+        release = threading.Event()
+        late = MagicMock(id="late")
+        docker = containers._docker_client.containers
+        docker.create.side_effect = lambda **kwargs: release.wait(5) and late
+        docker.list.return_value = []
+
+        containers._warm_task = asyncio.get_running_loop().create_task(
+            containers._fill_warm_pool(1)
+        )
+        await asyncio.sleep(0.05)  # the start is now blocked in its thread
+        cleanup = asyncio.create_task(containers.cleanup_all())
+        await asyncio.sleep(0.05)
+        release.set()
+        await cleanup
+
+        late.remove.assert_called_once_with(force=True)
+        assert containers._warm == []
+
+    @pytest.mark.asyncio
+    async def test_dead_warm_containers_are_skipped(self, containers):
+        docker = containers._docker_client.containers
+        docker.create.return_value = MagicMock(id="fresh")
+        docker.get.return_value.status = "exited"
+        containers._warm = ["stale"]
+
+        assert await containers.create_sandbox("s1") == "fresh"
+        assert containers._warm == []